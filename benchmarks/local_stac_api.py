@@ -0,0 +1,133 @@
+import json
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler
+
+from shapely.geometry import box, shape
+
+from controller.background_http_server import BackgroundHTTPServer
+
+CONFORMANCE = [
+    "https://api.stacspec.org/v1.0.0/core",
+    "https://api.stacspec.org/v1.0.0/item-search",
+    "https://api.stacspec.org/v1.0.0/item-search#query",
+    "https://api.stacspec.org/v1.0.0/item-search#sort",
+    "https://api.stacspec.org/v1.0.0/item-search#fields",
+]
+
+QUERY_OPERATORS = {
+    "eq": lambda value, target: value == target,
+    "lt": lambda value, target: value < target,
+    "lte": lambda value, target: value <= target,
+    "gt": lambda value, target: value > target,
+    "gte": lambda value, target: value >= target,
+    "in": lambda value, target: value in target,
+}
+
+
+def parse_datetime(value):
+    if value in ("", "..", None):
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")[:19])
+
+
+class LocalSTACAPI(BackgroundHTTPServer):
+    """Minimal STAC API item search over an in-memory list of items."""
+
+    def __init__(self, items, host="127.0.0.1", port=0):
+        super().__init__(host, port, self.__get_handler())
+        self.items = items
+        self.search_count = 0
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def get_landing_page(self):
+        return {
+            "type": "Catalog",
+            "id": "synthetic",
+            "stac_version": "1.0.0",
+            "description": "Synthetic benchmark catalog",
+            "conformsTo": CONFORMANCE,
+            "links": [
+                {"rel": "self", "href": self.url, "type": "application/json"},
+                {"rel": "root", "href": self.url, "type": "application/json"},
+                {"rel": "search", "href": f"{self.url}/search", "method": "POST",
+                 "type": "application/geo+json"},
+                {"rel": "search", "href": f"{self.url}/search", "method": "GET",
+                 "type": "application/geo+json"},
+            ],
+        }
+
+    @staticmethod
+    def __matches(item, search, geometry, start, end):
+        if search.get("collections") and item["collection"] not in search["collections"]:
+            return False
+        if geometry is not None and not shape(item["geometry"]).intersects(geometry):
+            return False
+        item_datetime = parse_datetime(item["properties"]["datetime"])
+        if start and item_datetime < start:
+            return False
+        if end and item_datetime > end:
+            return False
+        for name, operations in (search.get("query") or {}).items():
+            value = item["properties"].get(name)
+            for operator, target in operations.items():
+                if value is None or not QUERY_OPERATORS[operator](value, target):
+                    return False
+        return True
+
+    def search(self, search):
+        self.search_count += 1
+        geometry = None
+        if search.get("intersects"):
+            geometry = shape(search["intersects"])
+        elif search.get("bbox"):
+            geometry = box(*search["bbox"])
+        start, end = None, None
+        if search.get("datetime"):
+            dates = search["datetime"].split("/")
+            start = parse_datetime(dates[0])
+            end = parse_datetime(dates[-1])
+            if end and len(dates[-1]) == 10:
+                end = end.replace(hour=23, minute=59, second=59)
+
+        items = [
+            item for item in self.items if self.__matches(item, search, geometry, start, end)
+        ]
+        items.sort(key=lambda item: item["properties"]["datetime"], reverse=True)
+        limit = search.get("limit") or len(items)
+        return {"type": "FeatureCollection", "features": items[:limit], "links": []}
+
+    def __get_handler(self):
+        api = self
+
+        class STACRequestHandler(BaseHTTPRequestHandler):
+            def __send_json(self, content):
+                body = json.dumps(content).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.split("?")[0] in ("", "/"):
+                    self.__send_json(api.get_landing_page())
+                    return
+                if self.path.split("?")[0] == "/conformance":
+                    self.__send_json({"conformsTo": CONFORMANCE})
+                    return
+                self.send_error(404)
+
+            def do_POST(self):
+                if self.path.split("?")[0] != "/search":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                self.__send_json(api.search(json.loads(self.rfile.read(length) or b"{}")))
+
+            def log_message(self, format, *args):
+                return
+
+        return STACRequestHandler
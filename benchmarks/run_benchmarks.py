@@ -0,0 +1,258 @@
+"""Offline render benchmarks over synthetic COGs and a local STAC API.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --quick --compare benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_PATH, "src"))
+
+from benchmarks.local_stac_api import LocalSTACAPI  # noqa: E402
+from benchmarks import synthetic_data  # noqa: E402
+from controller.animation_creator import AnimationCreator  # noqa: E402
+from controller.catalog_searcher import CatalogSearcher  # noqa: E402
+from controller.image_renderer import ImageRenderer  # noqa: E402
+from model.buffer_point import BufferPoint  # noqa: E402
+from model.read_stac import ReadSTAC  # noqa: E402
+
+DEFAULT_DATA_PATH = os.path.join(ROOT_PATH, "benchmarks", "data")
+DEFAULT_RESULTS_PATH = os.path.join(ROOT_PATH, "benchmarks", "results")
+
+
+def get_feature(buffer_width):
+    latitude, longitude = synthetic_data.get_center()
+    return {
+        "type": "Feature",
+        "properties": {},
+        "geometry": BufferPoint().buffer(latitude, longitude, buffer_width),
+    }
+
+
+def get_rgb_params(items, buffer_width, max_size=None):
+    return {
+        "feature_geojson": get_feature(buffer_width),
+        "stac_list": items,
+        "image_format": "PNG",
+        "assets": ("red", "green", "blue"),
+        "min_value": 0,
+        "max_value": 4000,
+        "max_size": max_size,
+        "zip_file": True,
+    }
+
+
+def get_dem_params(items, buffer_width):
+    return {
+        "feature_geojson": get_feature(buffer_width),
+        "stac_list": items,
+        "image_format": "PNG",
+        "expression": "data",
+        "nodata": -32768,
+        "compute_min_max": True,
+        "create_contour": True,
+        "gap": 25,
+        "zip_file": True,
+    }
+
+
+def time_runs(function, repeat):
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start_time)
+    return durations, result
+
+
+def summarize(durations, **extra):
+    summary = {
+        "median_s": round(statistics.median(durations), 4),
+        "min_s": round(min(durations), 4),
+        "max_s": round(max(durations), 4),
+        "runs": [round(duration, 4) for duration in durations],
+    }
+    summary.update(extra)
+    return summary
+
+
+def bench_render(items, buffer_width, repeat):
+    def render():
+        stac_reader = ReadSTAC()
+        return stac_reader.render_mosaic_from_stac(get_rgb_params(items, buffer_width))
+
+    durations, result = time_runs(render, repeat)
+    return summarize(
+        durations,
+        stage_timings=result["stage_timings"],
+        zip_bytes=len(result["zip_file"]),
+    )
+
+
+def bench_contour(items, buffer_width, repeat):
+    def render():
+        stac_reader = ReadSTAC()
+        return stac_reader.render_mosaic_from_stac(get_dem_params(items, buffer_width))
+
+    durations, result = time_runs(render, repeat)
+    return summarize(
+        durations,
+        stage_timings=result["stage_timings"],
+        contour_features=len(result["contours"]["features"]),
+    )
+
+
+def bench_gif(stac_api, buffer_width, dates, repeat):
+    feature_geojson = get_feature(buffer_width)
+
+    def create_gif():
+        animation_creator = AnimationCreator(
+            CatalogSearcher(stac_url=stac_api.url), ImageRenderer())
+        return animation_creator.create_gif({
+            "feature_geojson": feature_geojson,
+            "date_string": f"2024-01-01/2024-{min(12, dates + 1):02d}-28",
+            "period_time_break": 30,
+            "time_per_image": 0.5,
+            "width": 300,
+            "height": 300,
+            "image_search": {"max_cloud_cover": 100, "collection": "sentinel-2-l2a"},
+            "image_render": {
+                "assets": ("red", "green", "blue"),
+                "min_value": 0,
+                "max_value": 4000,
+            },
+        })
+
+    durations, result = time_runs(create_gif, repeat)
+    return summarize(durations, gif_bytes=len(result["image"]))
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_PATH, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    os.makedirs(args.data_path, exist_ok=True)
+    results = {}
+    print(f"generating synthetic data in {args.data_path}")
+    dem_items = synthetic_data.create_dem_items(args.data_path, 1, size=args.size)
+
+    for item_count in args.item_counts:
+        items = synthetic_data.create_optical_items(args.data_path, item_count, size=args.size)
+        for buffer_width in args.buffer_widths:
+            name = f"render_rgb/items={item_count}/buffer={buffer_width}m"
+            results[name] = bench_render(items, buffer_width, args.repeat)
+            print(f"{name}: {results[name]['median_s']}s")
+
+    for buffer_width in args.buffer_widths:
+        name = f"render_dem_contour/buffer={buffer_width}m"
+        results[name] = bench_contour(dem_items, buffer_width, args.repeat)
+        print(f"{name}: {results[name]['median_s']}s")
+
+    gif_items = synthetic_data.create_optical_items(
+        args.data_path, 1, size=args.size, dates=args.gif_dates)
+    stac_api = LocalSTACAPI(gif_items).start()
+    try:
+        name = f"create_gif/frames={args.gif_dates}/buffer={args.buffer_widths[0]}m"
+        results[name] = bench_gif(stac_api, args.buffer_widths[0], args.gif_dates, args.repeat)
+        print(f"{name}: {results[name]['median_s']}s")
+    finally:
+        stac_api.stop()
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": get_git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {
+            "size": args.size,
+            "repeat": args.repeat,
+            "item_counts": args.item_counts,
+            "buffer_widths": args.buffer_widths,
+            "gif_dates": args.gif_dates,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    regressions = []
+    print(f"\n{'benchmark':<50} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in current["results"].items():
+        baseline_result = baseline.get("results", {}).get(name)
+        if not baseline_result:
+            print(f"{name:<50} {'-':>10} {result['median_s']:>10} {'new':>7}")
+            continue
+        ratio = result["median_s"] / baseline_result["median_s"] if baseline_result["median_s"] else 0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<50} {baseline_result['median_s']:>10} {result['median_s']:>10} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def save_results(results, results_path):
+    os.makedirs(results_path, exist_ok=True)
+    file_name = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{results['git_commit'] or 'local'}.json"
+    output_path = os.path.join(results_path, file_name)
+    with open(output_path, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    return output_path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-path", default=DEFAULT_DATA_PATH)
+    parser.add_argument("--results-path", default=DEFAULT_RESULTS_PATH)
+    parser.add_argument("--size", type=int, default=2048, help="pixels per synthetic item side")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--item-counts", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--buffer-widths", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--gif-dates", type=int, default=6)
+    parser.add_argument("--compare", help="baseline results json to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="flag a regression when median time grows more than this fraction")
+    parser.add_argument("--quick", action="store_true", help="small data and one run per case")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.size = 512
+        args.repeat = 1
+        args.buffer_widths = [500, 1500]
+        args.gif_dates = 3
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    output_path = save_results(results, args.results_path)
+    print(f"\nresults saved to {output_path}")
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
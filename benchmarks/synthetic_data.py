@@ -0,0 +1,130 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import rasterio
+import rasterio.shutil
+from rasterio.io import MemoryFile
+from rasterio.transform import Affine
+
+BANDS = ("red", "green", "blue", "nir")
+ORIGIN = (-45.2, -21.0)
+PIXEL_SIZE = 0.0001
+
+
+def write_cog(path, array, transform, nodata=None):
+    profile = {
+        "driver": "GTiff",
+        "height": array.shape[1],
+        "width": array.shape[2],
+        "count": array.shape[0],
+        "dtype": array.dtype,
+        "crs": "EPSG:4326",
+        "transform": transform,
+        "nodata": nodata,
+    }
+    with MemoryFile() as memory_file:
+        with memory_file.open(**profile) as dataset:
+            dataset.write(array)
+        with memory_file.open() as dataset:
+            rasterio.shutil.copy(
+                dataset,
+                path,
+                driver="COG",
+                compress="DEFLATE",
+                blocksize=512,
+                overview_resampling="average"
+            )
+
+
+def get_item_transform(column, row, size, overlap=0.1):
+    step = size * PIXEL_SIZE * (1 - overlap)
+    return Affine(
+        PIXEL_SIZE, 0, ORIGIN[0] + column * step,
+        0, -PIXEL_SIZE, ORIGIN[1] - row * step
+    )
+
+
+def get_footprint(transform, size):
+    xmin, ymax = transform.c, transform.f
+    xmax = xmin + size * transform.a
+    ymin = ymax + size * transform.e
+    return [xmin, ymin, xmax, ymax], {
+        "type": "Polygon",
+        "coordinates": [[
+            [xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax], [xmin, ymin]
+        ]]
+    }
+
+
+def create_item(item_id, collection, bbox, geometry, item_datetime, assets, cloud_cover=0):
+    return {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "stac_extensions": [],
+        "id": item_id,
+        "collection": collection,
+        "bbox": bbox,
+        "geometry": geometry,
+        "properties": {
+            "datetime": item_datetime.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "eo:cloud_cover": cloud_cover,
+            "platform": "synthetic",
+        },
+        "links": [],
+        "assets": {
+            name: {"href": os.path.abspath(href), "type": "image/tiff; application=geotiff"}
+            for name, href in assets.items()
+        },
+    }
+
+
+def create_optical_items(directory, item_count, size=1024, dates=1, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = int(np.ceil(np.sqrt(item_count)))
+    start_date = datetime(2024, 1, 1)
+    items = []
+    for date_index in range(dates):
+        item_datetime = start_date + timedelta(days=30 * date_index)
+        for index in range(item_count):
+            column, row = index % columns, index // columns
+            transform = get_item_transform(column, row, size)
+            bbox, geometry = get_footprint(transform, size)
+            item_id = f"synthetic-{date_index:03d}-{index:03d}"
+            assets = {}
+            gradient = np.linspace(0, 3000, size, dtype=np.float32)
+            for band_index, band in enumerate(BANDS):
+                noise = rng.normal(0, 150, (size, size)).astype(np.float32)
+                data = gradient[np.newaxis, :] + gradient[:, np.newaxis] * (band_index + 1) / 4 + noise
+                href = os.path.join(directory, f"{item_id}-{size}-{band}.tif")
+                if not os.path.exists(href):
+                    write_cog(href, np.clip(data, 1, 10000).astype(np.uint16)[np.newaxis], transform)
+                assets[band] = href
+            items.append(create_item(item_id, "sentinel-2-l2a", bbox, geometry, item_datetime, assets))
+    return items
+
+
+def create_dem_items(directory, item_count, size=1024):
+    columns = int(np.ceil(np.sqrt(item_count)))
+    items = []
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    for index in range(item_count):
+        column, row = index % columns, index // columns
+        transform = get_item_transform(column, row, size, overlap=0)
+        bbox, geometry = get_footprint(transform, size)
+        item_id = f"synthetic-dem-{index:03d}"
+        href = os.path.join(directory, f"{item_id}-{size}.tif")
+        if not os.path.exists(href):
+            elevation = (
+                800
+                + 300 * np.sin((x + column) * 2 * np.pi)
+                + 200 * np.cos((y + row) * 3 * np.pi)
+            ).astype(np.float32)
+            write_cog(href, elevation[np.newaxis], transform, nodata=-32768)
+        items.append(create_item(
+            item_id, "cop-dem-glo-30", bbox, geometry, datetime(2021, 1, 1), {"data": href}))
+    return items
+
+
+def get_center():
+    return ORIGIN[1] - 0.02, ORIGIN[0] + 0.02
@@ -1,4 +1,5 @@
 import os
+import re
 from datetime import datetime
 
 class AppConfig:
@@ -15,6 +16,12 @@ class AppConfig:
         self.geocoder_api_key = os.getenv("GEOCODER_API_KEY", "abcd")
         self.default_start_address = os.getenv("DEFAULT_START_ADDRESS", "San Francisco CA")
         self.address_max_chars = int(os.getenv("ADDRESS_MAX_CHARS", "128"))
+        self.geocode_cache_dir = os.getenv("GEOCODE_CACHE_DIR", "")
+        self.geocode_cache_max_bytes = int(os.getenv("GEOCODE_CACHE_MAX_BYTES", "16777216"))
+        self.geocode_cache_ttl = int(os.getenv("GEOCODE_CACHE_TTL_SEC", "2592000"))
+        self.geocode_negative_cache_ttl = int(os.getenv("GEOCODE_NEGATIVE_CACHE_TTL_SEC", "3600"))
+        self.geocoder_max_requests_per_second = float(os.getenv("GEOCODER_MAX_REQUESTS_PER_SEC", "1"))
+        self.geocode_batch_threads = int(os.getenv("GEOCODE_BATCH_THREADS", "4"))
         self.enable_sentinel = os.getenv("ENABLE_SENTINEL", "True").lower() in ('true', '1', 't')
         self.enable_sentinel1 = os.getenv("ENABLE_SENTINEL1", "False").lower() in ('true', '1', 't')
         self.enable_landsat = os.getenv("ENABLE_LANDSAT", "False").lower() in ('true', '1', 't')
@@ -36,6 +43,12 @@ class AppConfig:
         self.gif_default_interval = int(os.getenv("GIF_DEFAULT_INTERVAL_DAYS", "120"))
         self.gif_max_interval = int(os.getenv("GIF_MAX_INTERVAL_DAYS", "365"))
         self.allowed_gif_satellite = os.getenv("ALLOWED_GIF_SATELLITE", "sentinel 2").lower()
+        self.gif_render_threads = int(os.getenv("GIF_RENDER_THREADS", "4"))
+        self.gif_frame_oversample = float(os.getenv("GIF_FRAME_OVERSAMPLE", "1.25"))
+        self.gif_frame_size_bucket = int(os.getenv("GIF_FRAME_SIZE_BUCKET_PIXELS", "64"))
+        self.gif_frame_cache_max_bytes = int(os.getenv("GIF_FRAME_CACHE_MAX_BYTES", "134217728"))
+        self.gif_frame_max_items = int(os.getenv("GIF_FRAME_MAX_ITEMS", "10"))
+        self.gif_frame_recent_ttl = int(os.getenv("GIF_FRAME_RECENT_TTL_SEC", "3600"))
         self.max_saturation = float(os.getenv("IMAGE_MAX_SATURATION", 100))
         self.max_gamma = float(os.getenv("IMAGE_MAX_GAMMA", 100))
         self.max_sigmoidal = float(os.getenv("IMAGE_MAX_SIGMOIDAL", 100))
@@ -46,17 +59,52 @@ class AppConfig:
         self.enable_enhance_image = os.getenv("ENABLE_ENHANCE_IMAGE", "False").lower() in ('true', '1', 't')
         self.enhance_image_default = os.getenv("DEFAULT_ENHANCE_IMAGE", "False").lower() in ('true', '1', 't')
         self.enhance_image_passes = os.getenv("ENHANCE_IMAGE_PASSES", "1,2")
+        self.enhance_image_warm_up = os.getenv("ENHANCE_IMAGE_WARM_UP", "False").lower() in ('true', '1', 't')
         self.contour_equidistances = [int(value) for value in os.getenv("CONTOUR_EQUIDISTANCES", "5,25,50,100").split(",")]
         self.default_contour_equidistance = int(os.getenv("CONTOUR_EQUIDISTANCE", "50"))
         self.enable_max_pixels = os.getenv("ENABLE_MAX_PIXEL_CONTROL", "False").lower() in ('true', '1', 't')
         self.max_pixels_image = int(os.getenv("MAX_PIXELS_IMAGE", "1024"))
         self.default_pixels_image = int(os.getenv("DEFAULT_PIXELS_IMAGE", "0"))
+        self.preview_max_size_pixels = int(os.getenv("PREVIEW_MAX_SIZE_PIXELS", "1024"))
+        self.map_overlay_format = os.getenv("MAP_OVERLAY_FORMAT", "PNG").upper()
+        self.map_overlay_quality = int(os.getenv("MAP_OVERLAY_QUALITY", "85"))
+        self.enable_tile_server = os.getenv("ENABLE_TILE_SERVER", "False").lower() in ('true', '1', 't')
+        self.tile_server_host = os.getenv("TILE_SERVER_HOST", "127.0.0.1")
+        self.tile_server_port = int(os.getenv("TILE_SERVER_PORT", "8765"))
+        self.tile_server_url = os.getenv("TILE_SERVER_URL", "")
+        self.tile_cache_max_bytes = int(os.getenv("TILE_CACHE_MAX_BYTES", "134217728"))
+        self.tile_server_min_zoom = int(os.getenv("TILE_SERVER_MIN_ZOOM", "8"))
+        self.tile_server_max_zoom = int(os.getenv("TILE_SERVER_MAX_ZOOM", "18"))
+        self.enable_metrics_server = os.getenv("ENABLE_METRICS_SERVER", "False").lower() in ('true', '1', 't')
+        self.metrics_server_host = os.getenv("METRICS_SERVER_HOST", "127.0.0.1")
+        self.metrics_server_port = int(os.getenv("METRICS_SERVER_PORT", "9108"))
+        self.show_render_timings = os.getenv("SHOW_RENDER_TIMINGS", "False").lower() in ('true', '1', 't')
         self.enable_draw_polygon = os.getenv("ENABLE_DRAW_POLYGON", "False").lower() in ('true', '1', 't')
         self.enable_draw_retangle = os.getenv("ENABLE_DRAW_RETANGLE", "False").lower() in ('true', '1', 't')
         self.enable_draw_marker = os.getenv("ENABLE_DRAW_MARKER", "True").lower() in ('true', '1', 't')
         self.rdn_block_size = int(os.getenv("RDN_BLOCK_SIZE", "256"))
         self.enhance_image_buffer_size = int(os.getenv("ENHANCE_IMAGE_BUFFER_SIZE", "1000"))
         self.default_anti_aliasing = os.getenv("DEFAULT_ANTI_ALIASING", "True").lower() in ('true', '1', 't')
+        self.image_data_cache_max_bytes = int(os.getenv("IMAGE_DATA_CACHE_MAX_BYTES", "268435456"))
+        self.mosaic_item_threads = int(os.getenv("MOSAIC_ITEM_THREADS", "5"))
+        self.mosaic_asset_threads = int(os.getenv("MOSAIC_ASSET_THREADS", "3"))
+        self.mosaic_max_concurrent_reads = int(os.getenv("MOSAIC_MAX_CONCURRENT_READS", "32"))
+        self.mosaic_min_item_contribution = float(os.getenv("MOSAIC_MIN_ITEM_CONTRIBUTION", "0.01"))
+        self.dataset_pool_max_idle = int(os.getenv("DATASET_POOL_MAX_IDLE", "64"))
+        self.dataset_pool_idle = int(os.getenv("DATASET_POOL_IDLE_SEC", "300"))
+        self.render_cache_dir = os.getenv("RENDER_CACHE_DIR", "")
+        self.render_cache_max_bytes = int(os.getenv("RENDER_CACHE_MAX_BYTES", "1073741824"))
+        self.render_cache_ttl = int(os.getenv("RENDER_CACHE_TTL_SEC", "604800"))
+        self.stac_timeout = float(os.getenv("STAC_TIMEOUT_SEC", "10"))
+        self.stac_max_retries = int(os.getenv("STAC_MAX_RETRIES", "3"))
+        self.stac_pool_size = int(os.getenv("STAC_POOL_SIZE", "10"))
+        self.stac_search_threads = int(os.getenv("STAC_SEARCH_THREADS", "4"))
+        self.stac_slim_responses = os.getenv("STAC_SLIM_RESPONSES", "False").lower() in ('true', '1', 't')
+        self.search_cache_path = os.getenv("SEARCH_CACHE_PATH", "")
+        self.search_cache_ttl = int(os.getenv("SEARCH_CACHE_TTL_SEC", "2592000"))
+        self.search_cache_open_ended_ttl = int(os.getenv("SEARCH_CACHE_OPEN_ENDED_TTL_SEC", "3600"))
+        self.search_cache_padding = int(os.getenv("SEARCH_CACHE_PADDING_METERS", "1000"))
+        self.search_cache_overfetch = int(os.getenv("SEARCH_CACHE_OVERFETCH", "2"))
 
     def __get_satellites_params(self):
         params = {}
@@ -68,8 +116,22 @@ class AppConfig:
             params.update({"Sentinel 1": self.__get_sensor_sentinel1_params()})
         if self.enable_dem:
             params.update({"Copernicus DEM": self.__get_copernicus_dem_params()})
+        for sensor_params in params.values():
+            sensor_params["search_assets"] = self.__get_search_assets(sensor_params)
         return params
 
+    @staticmethod
+    def __get_search_assets(sensor_params):
+        assets = set()
+        for asset_names in sensor_params.get("assets", {}).values():
+            assets.update(asset_names)
+        for rgb_expression in sensor_params.get("RGB-expression", {}).values():
+            assets.update(rgb_expression["assets"])
+        # function names are picked up too, asking for a missing asset is harmless
+        for expression in sensor_params.get("expression", {}).values():
+            assets.update(re.findall(r"[A-Za-z_][A-Za-z0-9_]*", expression))
+        return sorted(assets)
+
     @staticmethod
     def __get_sensor_sentinel_params():
         pixel_size = 10
@@ -292,6 +354,17 @@ class AppConfig:
         aws_request_payer = os.getenv("SENTINEL1_AWS_REQUEST_PAYER", "provider")
         aws_no_sign_requests = os.getenv("SENTINEL1_AWS_NO_SIGN_REQUESTS", "NO")
         platforms = os.getenv("SENTINEL1_PLATFORMS", "")
+        instrument_mode = os.getenv("SENTINEL1_INSTRUMENT_MODE", "IW")
+        orbit_state = os.getenv("SENTINEL1_ORBIT_STATE", "").lower()
+        polarizations = [
+            value.strip().upper() for value in os.getenv("SENTINEL1_POLARIZATIONS", "").split(",")
+            if value.strip()
+        ]
+        query_filters = {}
+        if instrument_mode:
+            query_filters["sar:instrument_mode"] = {"eq": instrument_mode}
+        if orbit_state:
+            query_filters["sat:orbit_state"] = {"eq": orbit_state}
 
         return {
             "name": "Sentinel 1",
@@ -304,6 +377,8 @@ class AppConfig:
             "nodata": band_nodata_value,
             "max_size": image_max_size,
             "platforms": platforms,
+            "query_filters": query_filters,
+            "polarizations": polarizations,
             "assets": {
                 "vv|vh|vv": (
                     vv,
@@ -1,11 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from model.disk_cache import DiskCache
+from model.metrics import metrics
 from model.search_address import SearchAddress
 
 class AddressSearcher:
-    def __init__(self, api_url, api_key):
+    def __init__(
+            self,
+            api_url,
+            api_key,
+            cache_dir=None,
+            cache_max_bytes=16777216,
+            cache_ttl_seconds=2592000,
+            negative_cache_ttl_seconds=3600,
+            max_requests_per_second=None,
+            batch_threads=4
+        ):
         self.geolocator = SearchAddress(
             api_url=api_url,
-            api_key=api_key
+            api_key=api_key,
+            max_requests_per_second=max_requests_per_second
         )
+        self.batch_threads = batch_threads
+        self.negative_cache_ttl_seconds = negative_cache_ttl_seconds
+        self.cache = None
+        if cache_dir:
+            self.cache = DiskCache(
+                cache_dir,
+                cache_max_bytes,
+                ttl_seconds=cache_ttl_seconds
+            )
+
+    def get_cache_key(self, address):
+        normalized = SearchAddress.clean_address(address).casefold()
+        return f"{self.geolocator.api_url}\n{normalized}"
 
     def search_address(self, address):
-        return self.geolocator.search_address(address)
\ No newline at end of file
+        if self.cache is None:
+            return self.geolocator.search_address(address)
+
+        cache_key = self.get_cache_key(address)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            metrics.increment("geocode_cache_total", result="hit")
+            return cached["location"] or (0,0)
+        metrics.increment("geocode_cache_total", result="miss")
+
+        try:
+            location = self.geolocator.find_location(address)
+        except requests.RequestException:
+            return (0,0)
+        if location:
+            self.cache.set(cache_key, {"location": location})
+        elif self.negative_cache_ttl_seconds > 0:
+            # misses are kept shortly, the address may be fixed upstream
+            self.cache.set(
+                cache_key, {"location": None}, ttl_seconds=self.negative_cache_ttl_seconds)
+        return location or (0,0)
+
+    def search_addresses(self, addresses):
+        # each distinct address is geocoded once, results keep the input order
+        unique_addresses = {}
+        for address in addresses:
+            unique_addresses.setdefault(self.get_cache_key(address), address)
+        if not unique_addresses:
+            return []
+        max_workers = max(1, min(self.batch_threads, len(unique_addresses)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            locations = dict(zip(
+                unique_addresses,
+                executor.map(self.search_address, unique_addresses.values())
+            ))
+        return [locations[self.get_cache_key(address)] for address in addresses]
@@ -1,18 +1,49 @@
 from controller.catalog_searcher import CatalogSearcher
 from controller.image_renderer import ImageRenderer
 
+from model.memory_cache import MemoryCache
+from model.metrics import metrics
+
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from datetime import timedelta
 import io
+import json
+import math
 from PIL import Image
 from PIL import ImageFont
 from PIL import ImageDraw
 
 
 class AnimationCreator:
-    def __init__(self, catalog_searcher, image_renderer):
+    def __init__(
+            self,
+            catalog_searcher,
+            image_renderer,
+            render_threads=4,
+            frame_oversample=1.25,
+            frame_size_bucket=64,
+            frame_cache_max_bytes=134217728,
+            frame_max_items=10,
+            frame_recent_ttl_seconds=3600,
+            ingest_lag_days=3
+        ):
         self.catalog_searcher = catalog_searcher
         self.image_renderer = image_renderer
+        self.render_threads = render_threads
+        self.frame_oversample = frame_oversample
+        self.frame_size_bucket = frame_size_bucket
+        self.frame_max_items = frame_max_items
+        self.frame_recent_ttl_seconds = frame_recent_ttl_seconds
+        self.ingest_lag_days = ingest_lag_days
+        self.frame_cache = MemoryCache(
+            max_bytes=frame_cache_max_bytes,
+            size_of=self.__frame_size
+        )
+
+    @staticmethod
+    def __frame_size(frame):
+        return len(frame["image"] or b"") + 1024
 
     @staticmethod
     def __format_datetime(datetime_obj):
@@ -40,6 +71,130 @@ class AnimationCreator:
             date_range_start = date_range_end
         return date_ranges
 
+    @staticmethod
+    def __parse_item_date(stac_item):
+        return datetime.strptime(stac_item["properties"]["datetime"][:10], "%Y-%m-%d")
+
+    def __search_buckets(self, date_ranges, image_search_params):
+        # page back in time, asking only for as many items as the windows still need
+        max_items = image_search_params.get("max_items") or self.frame_max_items
+        windows = [self.__parse_date_string(date_range) for date_range in date_ranges]
+        buckets = [[] for _ in date_ranges]
+        seen_items = set()
+        search_start = windows[0][0]
+        search_end = windows[-1][1]
+        while True:
+            open_windows = [
+                index for index, (start_date, _) in enumerate(windows)
+                if start_date <= search_end and len(buckets[index]) < max_items
+            ]
+            if not open_windows:
+                break
+            page_size = max_items * len(open_windows)
+            date_string = f"{self.__format_datetime(search_start)}/{self.__format_datetime(search_end)}"
+            stac_items = self.catalog_searcher.search_images(
+                dict(image_search_params, date_string=date_string, max_items=page_size))
+            for item in stac_items:
+                item_key = (item.get("collection"), item.get("id"))
+                if item_key in seen_items:
+                    continue
+                seen_items.add(item_key)
+                item_date = self.__parse_item_date(item)
+                for index, (start_date, end_date) in enumerate(windows):
+                    if start_date <= item_date <= end_date and len(buckets[index]) < max_items:
+                        buckets[index].append(item)
+            if len(stac_items) < page_size:
+                break
+
+            oldest_date = min(self.__parse_item_date(item) for item in stac_items)
+            oldest_day_open = any(
+                start_date <= oldest_date <= end_date and len(buckets[index]) < max_items
+                for index, (start_date, end_date) in enumerate(windows)
+            )
+            next_end = oldest_date if oldest_day_open else oldest_date - timedelta(days=1)
+            if next_end >= search_end:
+                next_end = search_end - timedelta(days=1)
+            if next_end < search_start:
+                break
+            search_end = next_end
+        return buckets
+
+    def __get_frame_max_size(self, max_size, width, height):
+        frame_max_size = math.ceil(max(width, height) * self.frame_oversample)
+        frame_max_size = math.ceil(frame_max_size / self.frame_size_bucket) * self.frame_size_bucket
+        if max_size:
+            return min(int(max_size), frame_max_size)
+        return frame_max_size
+
+    @staticmethod
+    def __get_frame_key(date_range, image_search_params, image_render_params):
+        render_params = {
+            key: value for key, value in image_render_params.items()
+            if not key.startswith("aws_")
+        }
+        return json.dumps(
+            {
+                "date_range": date_range,
+                "search": image_search_params,
+                "render": render_params
+            },
+            sort_keys=True,
+            default=str
+        )
+
+    def __get_frame_ttl(self, date_range, frame):
+        _, end_date = self.__parse_date_string(date_range)
+        settled = datetime.now() - timedelta(days=self.ingest_lag_days)
+        # scenes can still be ingested into empty or recent windows
+        if not frame["image"] or end_date + timedelta(days=1) > settled:
+            return self.frame_recent_ttl_seconds
+        return None
+
+    def __render_frame(self, image_render_params, stac_items):
+        params = image_render_params.copy()
+        params.update({"stac_list": stac_items, "image_format": "PNG"})
+        result_image = self.image_renderer.render_mosaic_from_stac(params)
+        return {
+            "image": result_image.get("image"),
+            "projection_file": result_image.get("projection_file"),
+            "bounds": result_image.get("bounds")
+        }
+
+    def __render_frames(self, image_render_params, frames):
+        with ThreadPoolExecutor(max_workers=self.render_threads) as executor:
+            return list(executor.map(
+                self.__render_frame,
+                [image_render_params] * len(frames),
+                [stac_items for _, stac_items in frames]
+            ))
+
+    def __get_frames(self, date_ranges, image_search_params, image_render_params):
+        frame_keys = [
+            self.__get_frame_key(date_range, image_search_params, image_render_params)
+            for date_range in date_ranges
+        ]
+        frames = [self.frame_cache.get(frame_key) for frame_key in frame_keys]
+        missing = [index for index, frame in enumerate(frames) if frame is None]
+        if not missing:
+            return frames
+
+        missing_ranges = [date_ranges[index] for index in missing]
+        buckets = self.__search_buckets(missing_ranges, image_search_params)
+        to_render = [(index, items) for index, items in zip(missing, buckets) if items]
+        results = self.__render_frames(image_render_params, to_render)
+
+        for index in missing:
+            frames[index] = {"image": None, "projection_file": None, "bounds": None}
+        for (index, _), frame in zip(to_render, results):
+            frames[index] = frame
+        for index, date_range in zip(missing, missing_ranges):
+            self.frame_cache.set(
+                frame_keys[index],
+                frames[index],
+                ttl_seconds=self.__get_frame_ttl(date_range, frames[index])
+            )
+        return frames
+
     @staticmethod
     def __parse_image(image):
         image = io.BytesIO(image)
@@ -82,11 +237,11 @@ class AnimationCreator:
         return image.resize((width,height), Image.BILINEAR)
 
     def create_gif(self, params):
-        feature_geojson = params.pop("feature_geojson", {})
+        feature_geojson = params.get("feature_geojson", {})
         date_string = params.get("date_string")
         period_time_break = params.get("period_time_break", 90)
-        image_search_params = params.get("image_search")
-        image_render_params = params.get("image_render")
+        image_search_params = params.get("image_search").copy()
+        image_render_params = params.get("image_render").copy()
         font_size = params.get("font_size", 0.08)
         width = params.get("width", 300)
         height = params.get("height", 300)
@@ -96,28 +251,36 @@ class AnimationCreator:
         )
         date_ranges = self.__subidivide_time_range(date_string, each_days=period_time_break)
         image_search_params.update({"feature_geojson": feature_geojson})
-        image_render_params.update({"feature_geojson": feature_geojson})
-        images = []
-        for date_range in date_ranges:
-            end_date = date_range.split("/")[-1]
-            image_search_params.update({"date_string": date_range})
-            stac_items = self.catalog_searcher.search_images(image_search_params)
-            if len(stac_items)==0:
-                continue
-            image_render_params.update({"stac_list": stac_items, "image_format": "PNG"})
-
-            result_image = self.image_renderer.render_mosaic_from_stac(image_render_params)
-
-            image = self.__parse_image(result_image.pop("image"))
-            image = self.__resize_image(image, width, height)
-            image = self.__burn_date_into_image(
-                image, end_date, text_font, font_size, width, height)
-            images.append(image)
-
-        if len(images) == 0:
+        image_render_params.update({
+            "feature_geojson": feature_geojson,
+            "max_size": self.__get_frame_max_size(
+                image_render_params.get("max_size"), width, height)
+        })
+        timings = metrics.stage_timings("gif")
+        with timings.stage("frames"):
+            frames = self.__get_frames(date_ranges, image_search_params, image_render_params)
+        frames = [
+            (date_range, frame) for date_range, frame in zip(date_ranges, frames)
+            if frame["image"]
+        ]
+
+        if len(frames) == 0:
             raise ValueError("No image found")
 
-        image_gif = self.__save_gif(images, time_per_image_seconds=params.get("time_per_image", 1))
+        images = []
+        with timings.stage("compose"):
+            for date_range, result_image in frames:
+                end_date = date_range.split("/")[-1]
+                image = self.__parse_image(result_image.get("image"))
+                image = self.__resize_image(image, width, height)
+                image = self.__burn_date_into_image(
+                    image, end_date, text_font, font_size, width, height)
+                images.append(image)
+
+        with timings.stage("encode"):
+            image_gif = self.__save_gif(images, time_per_image_seconds=params.get("time_per_image", 1))
+        timings.add_bytes("encode", "out", len(image_gif))
+        metrics.increment("gif_frames_total", len(images))
         return {
             "image": image_gif,
             "projection_file": result_image.get("projection_file"),
@@ -0,0 +1,28 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+
+class BackgroundHTTPServer:
+    def __init__(self, host, port, handler_class):
+        self.host = host
+        self.port = port
+        self.handler_class = handler_class
+        self.__server = None
+        self.__server_thread = None
+
+    def start(self):
+        if self.__server is None:
+            self.__server = ThreadingHTTPServer((self.host, self.port), self.handler_class)
+            self.__server.daemon_threads = True
+            self.port = self.__server.server_address[1]
+            self.__server_thread = threading.Thread(
+                target=self.__server.serve_forever, daemon=True)
+            self.__server_thread.start()
+        return self
+
+    def stop(self):
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+            self.__server_thread = None
@@ -1,16 +1,107 @@
+import hashlib
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from shapely.geometry import box, mapping, shape
+
+from model.metrics import metrics
+from model.search_cache import SearchCache
 from model.search_stac import SearchSTAC
 
 class CatalogSearcher:
     def __init__(
             self,
-            stac_url
+            stac_url,
+            slim_responses=False,
+            max_scanned_items_factor=10,
+            search_cache_path=None,
+            search_cache_ttl_seconds=2592000,
+            search_cache_open_ended_ttl_seconds=3600,
+            search_cache_padding_meters=1000,
+            search_cache_overfetch=2,
+            timeout_seconds=10,
+            max_retries=3,
+            pool_maxsize=10,
+            search_threads=4
         ):
         self.stac_url = stac_url
-        self.search_stac = SearchSTAC(stac_url=self.stac_url)
+        self.search_threads = search_threads
+        self.slim_responses = slim_responses
+        self.max_scanned_items_factor = max_scanned_items_factor
+        self.search_cache_padding_meters = search_cache_padding_meters
+        self.search_cache_overfetch = search_cache_overfetch
+        self.search_stac = SearchSTAC(
+            stac_url=self.stac_url,
+            timeout_seconds=timeout_seconds,
+            max_retries=max_retries,
+            pool_maxsize=pool_maxsize
+        )
+        self.search_cache = None
+        if search_cache_path:
+            self.search_cache = SearchCache(
+                search_cache_path,
+                ttl_seconds=search_cache_ttl_seconds,
+                open_ended_ttl_seconds=search_cache_open_ended_ttl_seconds
+            )
+
+    query_operators = {
+        "eq": lambda value, target: value == target,
+        "neq": lambda value, target: value != target,
+        "lt": lambda value, target: value < target,
+        "lte": lambda value, target: value <= target,
+        "gt": lambda value, target: value > target,
+        "gte": lambda value, target: value >= target,
+        "in": lambda value, target: value in target,
+    }
+
+    @staticmethod
+    def __get_query_filters(params):
+        query_filters = params.get("query_filters")
+        if query_filters is None and params.get("collection") == "sentinel-1-grd":
+            return {"sar:instrument_mode": {"eq": "IW"}}
+        return query_filters or {}
+
+    @staticmethod
+    def __get_polarizations_filter(polarizations):
+        return {
+            "op": "a_contains",
+            "args": [{"property": "sar:polarizations"}, list(polarizations)]
+        }
+
+    def __matches_filters(self, result, query_filters, polarizations):
+        properties = result.get("properties", {})
+        for name, operations in query_filters.items():
+            value = properties.get(name)
+            for operator, target in operations.items():
+                if value is None or not self.query_operators[operator](value, target):
+                    return False
+        item_polarizations = properties.get("sar:polarizations", [])
+        return all(polarization in item_polarizations for polarization in polarizations)
+
+    item_fields = (
+        "type",
+        "stac_version",
+        "id",
+        "collection",
+        "bbox",
+        "geometry",
+        "properties.datetime",
+    )
+
+    def __get_fields(self, query, polarizations, assets):
+        include = list(self.item_fields)
+        include.extend(f"properties.{name}" for name in query)
+        if polarizations:
+            include.append("properties.sar:polarizations")
+        include.extend(f"assets.{asset}" for asset in assets)
+        return {"include": include, "exclude": []}
 
     def search_images(self, params):
         feature_geojson = params.get("feature_geojson",{})
         geometry = feature_geojson.get("geometry")
+        query_filters = self.__get_query_filters(params)
+        polarizations = params.get("polarizations") or []
         kwargs = {
             "datetime": params.get("date_string"),
             "max_items": params.get("max_items"),
@@ -27,8 +118,113 @@ class CatalogSearcher:
         if params.get("platforms"):
             kwargs["query"].update({"platform":{"in": params.get("platforms")}})
 
-        results = self.search_stac.get_items(**kwargs)
+        kwargs["query"].update(query_filters)
+        filter_supported = bool(polarizations) and self.search_stac.conforms_to("FILTER")
+        if filter_supported:
+            kwargs["filter"] = self.__get_polarizations_filter(polarizations)
+            kwargs["filter_lang"] = "cql2-json"
+
+        if self.slim_responses and params.get("assets"):
+            kwargs["fields"] = self.__get_fields(
+                kwargs["query"], polarizations, params.get("assets"))
+
+        # only check locally what the server could not apply
+        local_query_filters = query_filters
+        if query_filters and self.search_stac.conforms_to("QUERY"):
+            local_query_filters = {}
+        local_polarizations = [] if filter_supported else polarizations
+        if local_query_filters or local_polarizations:
+            kwargs["item_filter"] = lambda result: self.__matches_filters(
+                result, local_query_filters, local_polarizations)
+
+        if self.search_cache is None or not geometry:
+            results, _ = self.__get_items(kwargs, params.get("collection"))
+        else:
+            local_filters = {
+                "query_filters": local_query_filters,
+                "polarizations": list(local_polarizations),
+            }
+            results = self.__get_cached_items(kwargs, params.get("collection"), local_filters)
+
+        metrics.increment("stac_search_items_total", len(results), collection=params.get("collection"))
+        return results
+
+    def search_images_batch(self, queries):
+        # queries maps any hashable key to search_images params
+        keys = list(queries)
+        if not keys:
+            return {}
+        max_workers = max(1, min(self.search_threads, len(keys)))
+        with metrics.timer("stac_batch_search_seconds"):
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(self.search_images, [queries[key] for key in keys]))
+        metrics.increment("stac_batch_queries_total", len(keys))
+        return dict(zip(keys, results))
+
+    def __get_items(self, kwargs, collection):
+        # returns the items and whether the server may hold older matching ones
+        kwargs = dict(kwargs)
+        max_items = kwargs.get("max_items")
+        scanned_items = [0]
+        if "item_filter" in kwargs and max_items:
+            item_filter = kwargs["item_filter"]
+
+            def counting_filter(item):
+                scanned_items[0] += 1
+                return item_filter(item)
+
+            kwargs["item_filter"] = counting_filter
+            kwargs["max_scanned_items"] = max_items * self.max_scanned_items_factor
+        with metrics.timer("stac_search_seconds", collection=collection):
+            results = self.search_stac.get_items(**kwargs)
+        truncated = bool(max_items) and (
+            len(results) >= max_items
+            or scanned_items[0] >= kwargs.get("max_scanned_items", float("inf")))
+        return results, truncated
+
+    def __get_signature(self, kwargs, local_filters):
+        search = {
+            key: value for key, value in kwargs.items()
+            if key not in ("datetime", "intersects", "max_items", "item_filter")
+        }
+        # item_filter is a callable, so key on what it checks instead
+        search["local_filters"] = local_filters
+        search["stac_url"] = self.stac_url
+        content = json.dumps(search, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def __get_padded_geometry(self, geometry):
+        min_x, min_y, max_x, max_y = shape(geometry).bounds
+        padding_y = self.search_cache_padding_meters / 111320
+        latitude = math.radians(min(abs(min_y), abs(max_y), 89))
+        padding_x = padding_y / max(math.cos(latitude), 0.01)
+        return mapping(box(
+            min_x - padding_x, min_y - padding_y, max_x + padding_x, max_y + padding_y))
+
+    def __store_items(self, signature, kwargs, results, truncated):
+        self.search_cache.set(
+            signature, kwargs["intersects"], kwargs["datetime"], results, truncated=truncated)
+
+    def __get_cached_items(self, kwargs, collection, local_filters):
+        signature = self.__get_signature(kwargs, local_filters)
+        max_items = kwargs.get("max_items")
+        results = self.search_cache.get(
+            signature, kwargs["intersects"], kwargs["datetime"], max_items)
+        if results is not None:
+            metrics.increment("stac_search_cache_total", result="hit", collection=collection)
+            return results
+        metrics.increment("stac_search_cache_total", result="miss", collection=collection)
+
+        # search a padded area so that nearby searches can be answered locally
+        padded_kwargs = dict(kwargs, intersects=self.__get_padded_geometry(kwargs["intersects"]))
+        if max_items:
+            padded_kwargs["max_items"] = max_items * self.search_cache_overfetch
+        self.__store_items(signature, padded_kwargs, *self.__get_items(padded_kwargs, collection))
+        results = self.search_cache.get(
+            signature, kwargs["intersects"], kwargs["datetime"], max_items)
+        if results is not None:
+            return results
 
-        if params.get("collection") == "sentinel-1-grd":
-            results = [result for result in results if result.get("properties",{}).get("sar:instrument_mode","")=="IW"]
-        return results
\ No newline at end of file
+        results, truncated = self.__get_items(kwargs, collection)
+        self.__store_items(signature, kwargs, results, truncated)
+        return results
@@ -1,22 +1,132 @@
-from controller.environment_variable_manager import EnvContextManager
+import hashlib
+import json
+from rasterio.session import AWSSession
 
+from model.disk_cache import DiskCache
 from model.read_stac import ReadSTAC
 
 class ImageRenderer:
-    def __init__(self, rdn_block_size=256):
-        self.stac_reader = self.__model_read_stac(rdn_block_size)
+    def __init__(
+            self,
+            rdn_block_size=256,
+            image_data_cache_max_bytes=268435456,
+            item_threads=5,
+            asset_threads=3,
+            max_concurrent_reads=32,
+            enhance_warm_up=False,
+            dataset_pool_max_idle=64,
+            dataset_pool_idle_seconds=300,
+            render_cache_dir=None,
+            render_cache_max_bytes=1073741824,
+            render_cache_ttl_seconds=None
+        ):
+        self.stac_reader = self.__model_read_stac(
+            rdn_block_size,
+            image_data_cache_max_bytes,
+            item_threads,
+            asset_threads,
+            max_concurrent_reads,
+            enhance_warm_up,
+            dataset_pool_max_idle,
+            dataset_pool_idle_seconds
+        )
         self.colormaps = self.stac_reader.colormaps
+        self.aws_sessions = {}
+        self.render_cache = None
+        if render_cache_dir:
+            self.render_cache = DiskCache(
+                render_cache_dir,
+                render_cache_max_bytes,
+                ttl_seconds=render_cache_ttl_seconds
+            )
+
+    @staticmethod
+    def __model_read_stac(
+            rdn_block_size,
+            image_data_cache_max_bytes,
+            item_threads,
+            asset_threads,
+            max_concurrent_reads,
+            enhance_warm_up,
+            dataset_pool_max_idle,
+            dataset_pool_idle_seconds
+        ):
+        return ReadSTAC(
+            rdn_block_size=rdn_block_size,
+            image_data_cache_max_bytes=image_data_cache_max_bytes,
+            item_threads=item_threads,
+            asset_threads=asset_threads,
+            max_concurrent_reads=max_concurrent_reads,
+            enhance_warm_up=enhance_warm_up,
+            dataset_pool_max_idle=dataset_pool_max_idle,
+            dataset_pool_idle_seconds=dataset_pool_idle_seconds
+        )
 
     @staticmethod
-    def __model_read_stac(rdn_block_size):
-        return ReadSTAC(rdn_block_size=rdn_block_size)
+    def __get_aws_credentials(params):
+        return (
+            params.get("aws_access_key_id", ""),
+            params.get("aws_secret_access_key", ""),
+            params.get("aws_region_name", ""),
+            params.get("aws_request_payer", "provider"),
+            params.get("aws_no_sign_requests", "NO")
+        )
+
+    def get_aws_session(self, params):
+        credentials = self.__get_aws_credentials(params)
+        if credentials not in self.aws_sessions:
+            access_key_id, secret_access_key, region_name, request_payer, no_sign_requests = credentials
+            self.aws_sessions[credentials] = AWSSession(
+                aws_access_key_id=access_key_id or None,
+                aws_secret_access_key=secret_access_key or None,
+                region_name=region_name or None,
+                requester_pays=request_payer == "requester",
+                aws_unsigned=no_sign_requests.lower() in ("yes", "true", "1")
+            )
+        return self.aws_sessions[credentials]
+
+    @staticmethod
+    def get_render_key(params):
+        items = [
+            (item.get("collection"), item.get("id"))
+            for item in params.get("stac_list") or []
+        ]
+        render_params = {
+            key: value for key, value in params.items()
+            if key != "stac_list" and not key.startswith("aws_")
+        }
+        fingerprint = json.dumps(
+            {"items": items, "params": render_params},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(fingerprint.encode()).hexdigest()
 
     def render_mosaic_from_stac(self, params):
-        with EnvContextManager(
-            AWS_ACCESS_KEY_ID = params.get("aws_access_key_id",""),
-            AWS_SECRET_ACCESS_KEY = params.get("aws_secret_access_key",""),
-            AWS_NO_SIGN_REQUESTS = params.get("aws_no_sign_requests","NO"),
-            AWS_REQUEST_PAYER = params.get("aws_request_payer","provider"),
-            AWS_REGION = params.get("aws_region_name","")
-        ):
-            return self.stac_reader.render_mosaic_from_stac(params)
+        if self.render_cache is None:
+            return self.stac_reader.render_mosaic_from_stac(
+                params,
+                session=self.get_aws_session(params)
+            )
+
+        render_key = self.get_render_key(params)
+        result = self.render_cache.get(render_key)
+        if result is None:
+            result = self.stac_reader.render_mosaic_from_stac(
+                params,
+                session=self.get_aws_session(params)
+            )
+            self.render_cache.set(render_key, result)
+        return result
+
+    def create_zip_from_render(self, image_data, params):
+        return self.stac_reader.create_zip_from_render(image_data, params)
+
+    def render_tile_from_stac(self, params, tile_x, tile_y, tile_z):
+        return self.stac_reader.render_tile_from_stac(
+            params,
+            tile_x,
+            tile_y,
+            tile_z,
+            session=self.get_aws_session(params)
+        )
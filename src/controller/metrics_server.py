@@ -0,0 +1,30 @@
+from http.server import BaseHTTPRequestHandler
+
+from controller.background_http_server import BackgroundHTTPServer
+from model.metrics import metrics
+
+
+class MetricsServer(BackgroundHTTPServer):
+    def __init__(self, host="127.0.0.1", port=9108, metrics_registry=None):
+        self.metrics = metrics_registry or metrics
+        super().__init__(host, port, self.__get_handler())
+
+    def __get_handler(self):
+        metrics_server = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                content = metrics_server.metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                return
+
+        return MetricsRequestHandler
@@ -0,0 +1,9 @@
+from model.plan_mosaic import PlanMosaic
+
+class MosaicPlanner:
+    def __init__(self, min_contribution=0.01):
+        self.plan_mosaic = PlanMosaic(min_contribution=min_contribution)
+
+    def plan(self, stac_items, feature_geojson):
+        geometry = feature_geojson.get("geometry", feature_geojson)
+        return self.plan_mosaic.plan(stac_items, geometry)
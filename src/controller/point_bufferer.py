@@ -5,4 +5,7 @@ class PointBufferer:
         self.point_buffer = BufferPoint()
 
     def buffer(self, latitude, longitude, distance):
-        return self.point_buffer.buffer(latitude, longitude, distance)
\ No newline at end of file
+        return self.point_buffer.buffer(latitude, longitude, distance)
+
+    def buffer_many(self, latitudes, longitudes, distance):
+        return self.point_buffer.buffer_many(latitudes, longitudes, distance)
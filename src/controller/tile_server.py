@@ -0,0 +1,149 @@
+import ipaddress
+import logging
+import re
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import morecantile
+from shapely.geometry import box, shape
+
+from controller.background_http_server import BackgroundHTTPServer
+from model.memory_cache import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+
+class TileServer(BackgroundHTTPServer):
+    tile_path = re.compile(r"^/(?P<layer_id>[0-9a-f]+)/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.png$")
+
+    def __init__(
+            self,
+            image_renderer,
+            host="127.0.0.1",
+            port=8765,
+            public_url=None,
+            tile_cache_max_bytes=134217728,
+            max_layers=64,
+            min_zoom=8,
+            max_zoom=18
+        ):
+        super().__init__(host, port, self.__get_handler())
+        self.image_renderer = image_renderer
+        self.public_url = public_url
+        self.tile_cache = MemoryCache(max_bytes=tile_cache_max_bytes)
+        self.max_layers = max_layers
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.tms = morecantile.tms.get("WebMercatorQuad")
+        self.layers = {}
+        self.__layers_lock = threading.Lock()
+
+    def is_loopback(self):
+        if self.host == "localhost":
+            return True
+        try:
+            return ipaddress.ip_address(self.host).is_loopback
+        except ValueError:
+            return False
+
+    def start(self):
+        if not self.public_url:
+            if not self.is_loopback():
+                raise ValueError(
+                    f"Tile server on {self.host} needs a public URL (TILE_SERVER_URL) "
+                    "that browsers can reach")
+            logger.warning(
+                "Tile server advertises %s:%s, map tiles only load in a browser on this "
+                "machine; set TILE_SERVER_URL for remote users", self.host, self.port)
+        return super().start()
+
+    def register_layer(self, params, min_zoom=None, max_zoom=None):
+        feature_geojson = params.get("feature_geojson") or {}
+        geometry = feature_geojson.get("geometry", feature_geojson)
+        if not geometry:
+            raise ValueError("Tile layers need a feature_geojson to limit their area")
+        aoi = shape(geometry)
+        layer_id = self.image_renderer.get_render_key(params)[:32]
+        layer = {
+            "params": params.copy(),
+            "aoi": aoi,
+            "bounds": aoi.bounds,
+            "min_zoom": self.min_zoom if min_zoom is None else min_zoom,
+            "max_zoom": self.max_zoom if max_zoom is None else max_zoom,
+        }
+        with self.__layers_lock:
+            self.layers.pop(layer_id, None)
+            self.layers[layer_id] = layer
+            while len(self.layers) > self.max_layers:
+                self.layers.pop(next(iter(self.layers)))
+        return layer_id
+
+    def get_tile_url(self, layer_id):
+        public_url = (self.public_url or f"http://{self.host}:{self.port}").rstrip("/")
+        return f"{public_url}/{layer_id}/{{z}}/{{x}}/{{y}}.png"
+
+    def __is_tile_in_layer(self, layer, tile_x, tile_y, tile_z):
+        if not layer["min_zoom"] <= tile_z <= layer["max_zoom"]:
+            return False
+        tile_bounds = self.tms.bounds(morecantile.Tile(tile_x, tile_y, tile_z))
+        min_x, min_y, max_x, max_y = layer["bounds"]
+        if tile_bounds.left > max_x or tile_bounds.right < min_x \
+                or tile_bounds.bottom > max_y or tile_bounds.top < min_y:
+            return False
+        return layer["aoi"].intersects(box(*tile_bounds))
+
+    def get_tile(self, layer_id, tile_x, tile_y, tile_z):
+        layer = self.layers.get(layer_id)
+        if layer is None:
+            raise KeyError(layer_id)
+        # tiles outside the AOI or zoom range are empty, never read them
+        if not self.__is_tile_in_layer(layer, tile_x, tile_y, tile_z):
+            return b""
+        params = layer["params"]
+
+        cache_key = (layer_id, tile_z, tile_x, tile_y)
+        tile = self.tile_cache.get(cache_key)
+        if tile is None:
+            tile = self.image_renderer.render_tile_from_stac(
+                params, tile_x, tile_y, tile_z) or b""
+            self.tile_cache.set(cache_key, tile)
+        return tile
+
+    def __get_handler(self):
+        tile_server = self
+
+        class TileRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                match = tile_server.tile_path.match(self.path.split("?")[0])
+                if not match:
+                    self.send_error(404)
+                    return
+                try:
+                    tile = tile_server.get_tile(
+                        match["layer_id"], int(match["x"]), int(match["y"]), int(match["z"]))
+                except KeyError:
+                    self.send_error(404, "Layer not found")
+                    return
+                except Exception:
+                    # errors may hold paths or asset URLs, keep them in the log
+                    logger.exception("Tile %s failed to render", self.path)
+                    self.send_error(500)
+                    return
+
+                if not tile:
+                    self.send_response(204)
+                    self.send_header("Access-Control-Allow-Origin", "*")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(tile)))
+                self.send_header("Cache-Control", "public, max-age=3600")
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                self.wfile.write(tile)
+
+            def log_message(self, format, *args):
+                return
+
+        return TileRequestHandler
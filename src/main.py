@@ -8,6 +8,9 @@ from controller.catalog_searcher import CatalogSearcher
 from controller.address_searcher import AddressSearcher
 from controller.point_bufferer import PointBufferer
 from controller.animation_creator import AnimationCreator
+from controller.tile_server import TileServer
+from controller.mosaic_planner import MosaicPlanner
+from controller.metrics_server import MetricsServer
 from datetime import datetime, timedelta
 
 app_config_data = AppConfig()
@@ -20,7 +23,19 @@ st.set_page_config(
 
 @st.cache_resource
 def get_catalog_searcher():
-    return CatalogSearcher(app_config_data.stac_url)
+    return CatalogSearcher(
+        app_config_data.stac_url,
+        slim_responses=app_config_data.stac_slim_responses,
+        search_cache_path=app_config_data.search_cache_path,
+        search_cache_ttl_seconds=app_config_data.search_cache_ttl,
+        search_cache_open_ended_ttl_seconds=app_config_data.search_cache_open_ended_ttl,
+        search_cache_padding_meters=app_config_data.search_cache_padding,
+        search_cache_overfetch=app_config_data.search_cache_overfetch,
+        timeout_seconds=app_config_data.stac_timeout,
+        max_retries=app_config_data.stac_max_retries,
+        pool_maxsize=app_config_data.stac_pool_size,
+        search_threads=app_config_data.stac_search_threads
+    )
 
 @st.cache_resource
 def get_point_bufferer():
@@ -30,25 +45,80 @@ def get_point_bufferer():
 def get_address_searcher():
     return AddressSearcher(
     api_url=app_config_data.geocoder_url,
-    api_key=app_config_data.geocoder_api_key
+    api_key=app_config_data.geocoder_api_key,
+    cache_dir=app_config_data.geocode_cache_dir,
+    cache_max_bytes=app_config_data.geocode_cache_max_bytes,
+    cache_ttl_seconds=app_config_data.geocode_cache_ttl,
+    negative_cache_ttl_seconds=app_config_data.geocode_negative_cache_ttl,
+    max_requests_per_second=app_config_data.geocoder_max_requests_per_second,
+    batch_threads=app_config_data.geocode_batch_threads
 )
 
 @st.cache_resource
-def get_image_renderer(rdn_block_size):
-    return ImageRenderer(rdn_block_size=rdn_block_size)
+def get_image_renderer():
+    return ImageRenderer(
+        rdn_block_size=app_config_data.rdn_block_size,
+        image_data_cache_max_bytes=app_config_data.image_data_cache_max_bytes,
+        item_threads=app_config_data.mosaic_item_threads,
+        asset_threads=app_config_data.mosaic_asset_threads,
+        max_concurrent_reads=app_config_data.mosaic_max_concurrent_reads,
+        enhance_warm_up=app_config_data.enable_enhance_image and app_config_data.enhance_image_warm_up,
+        dataset_pool_max_idle=app_config_data.dataset_pool_max_idle,
+        dataset_pool_idle_seconds=app_config_data.dataset_pool_idle,
+        render_cache_dir=app_config_data.render_cache_dir,
+        render_cache_max_bytes=app_config_data.render_cache_max_bytes,
+        render_cache_ttl_seconds=app_config_data.render_cache_ttl
+    )
 
 @st.cache_resource
 def get_animation_creator(_worker_catalog_searcher, _worker_image_renderer):
     return AnimationCreator(
     catalog_searcher=worker_catalog_searcher,
-    image_renderer=worker_image_renderer
+    image_renderer=worker_image_renderer,
+    render_threads=app_config_data.gif_render_threads,
+    frame_oversample=app_config_data.gif_frame_oversample,
+    frame_size_bucket=app_config_data.gif_frame_size_bucket,
+    frame_cache_max_bytes=app_config_data.gif_frame_cache_max_bytes,
+    frame_max_items=app_config_data.gif_frame_max_items,
+    frame_recent_ttl_seconds=app_config_data.gif_frame_recent_ttl
+)
+
+@st.cache_resource
+def get_mosaic_planner():
+    return MosaicPlanner(
+    min_contribution=app_config_data.mosaic_min_item_contribution
 )
 
+@st.cache_resource
+def get_tile_server(_worker_image_renderer):
+    return TileServer(
+    image_renderer=worker_image_renderer,
+    host=app_config_data.tile_server_host,
+    port=app_config_data.tile_server_port,
+    public_url=app_config_data.tile_server_url,
+    tile_cache_max_bytes=app_config_data.tile_cache_max_bytes,
+    min_zoom=app_config_data.tile_server_min_zoom,
+    max_zoom=app_config_data.tile_server_max_zoom
+).start()
+
+@st.cache_resource
+def get_metrics_server():
+    return MetricsServer(
+    host=app_config_data.metrics_server_host,
+    port=app_config_data.metrics_server_port
+).start()
+
 worker_catalog_searcher = get_catalog_searcher()
 worker_point_bufferer = get_point_bufferer()
 worker_address_searcher = get_address_searcher()
-worker_image_renderer = get_image_renderer(app_config_data.rdn_block_size)
+worker_image_renderer = get_image_renderer()
+worker_mosaic_planner = get_mosaic_planner()
 worker_animation_creator = get_animation_creator(worker_catalog_searcher, worker_image_renderer)
+worker_tile_server = None
+if app_config_data.enable_tile_server:
+    worker_tile_server = get_tile_server(worker_image_renderer)
+if app_config_data.enable_metrics_server:
+    get_metrics_server()
 
 colormaps = sorted(worker_image_renderer.colormaps)
 
@@ -104,7 +174,10 @@ def create_gif(
         "image_search":{
             "max_cloud_cover": max_cloud_cover,
             "collection": satellite_view_params["collection_name"],
-            "platforms": satellite_view_params["platforms"]
+            "platforms": satellite_view_params["platforms"],
+            "query_filters": satellite_view_params.get("query_filters"),
+            "polarizations": satellite_view_params.get("polarizations"),
+            "assets": satellite_view_params.get("search_assets")
         },
         "image_render": satellite_view_params
     }
@@ -112,7 +185,18 @@ def create_gif(
     return result
 
 @st.cache_data
-def catalog_search(max_items, coords, buffer_width, date_string, max_cloud_cover, collection, platforms):
+def catalog_search(
+    max_items,
+    coords,
+    buffer_width,
+    date_string,
+    max_cloud_cover,
+    collection,
+    platforms,
+    query_filters=None,
+    polarizations=None,
+    assets=None
+    ):
     feature_geojson = {
         "type": "Feature",
         "properties": {},
@@ -128,13 +212,15 @@ def catalog_search(max_items, coords, buffer_width, date_string, max_cloud_cover
         "max_cloud_cover": max_cloud_cover,
         "max_items": max_items,
         "collection": collection,
-        "platforms": platforms
+        "platforms": platforms,
+        "query_filters": query_filters,
+        "polarizations": polarizations,
+        "assets": assets
     }
 
     return worker_catalog_searcher.search_images(params)
 
-@st.cache_data
-def mosaic_render(
+def get_render_params(
     stac_list,
     coords,
     buffer_width,
@@ -148,7 +234,8 @@ def mosaic_render(
     compute_min_max,
     create_contour,
     contour_gap,
-    max_size_pixels
+    max_size_pixels,
+    zip_file=True
     ):
     feature_geojson = {
         "type": "Feature",
@@ -161,11 +248,11 @@ def mosaic_render(
     }
     params = satellite_params.copy()
     params.update({
-        "zip_file": True,
+        "zip_file": zip_file,
         "image_format": "PNG",
         "feature_geojson": feature_geojson,
         "stac_list": stac_list,
-        "image_as_array": True,
+        "image_as_array": False,
         "enhance_image": enhance_image,
         "enhance_passes": enhance_passes,
         "compute_min_max": compute_min_max,
@@ -182,11 +269,38 @@ def mosaic_render(
     params.update(view_params)
     params.update({"min_value":image_range[0], "max_value":image_range[1]})
     params.update({"color_formula": color_formula, "colormap":colormap})
+    return params
 
+@st.cache_data
+def plan_mosaic(stac_items, coords, buffer_width):
+    feature_geojson = {
+        "type": "Feature",
+        "properties": {},
+        "geometry": buffer_point(
+            coords[0],
+            coords[1],
+            buffer_width
+        )
+    }
+    return worker_mosaic_planner.plan(stac_items, feature_geojson)
+
+@st.cache_data
+def mosaic_render(*render_args, zip_file=True):
+    params = get_render_params(*render_args, zip_file=zip_file)
     image_data = worker_image_renderer.render_mosaic_from_stac(params)
 
     return image_data
 
+def get_geometry_bounds(geometry):
+    longitudes = [coordinate[0] for coordinate in geometry["coordinates"][0]]
+    latitudes = [coordinate[1] for coordinate in geometry["coordinates"][0]]
+    return [[min(latitudes), min(longitudes)], [max(latitudes), max(longitudes)]]
+
+def get_preview_max_size(max_size_pixels):
+    if max_size_pixels and int(max_size_pixels) <= app_config_data.preview_max_size_pixels:
+        return max_size_pixels
+    return app_config_data.preview_max_size_pixels
+
 def create_download_zip_button(zip_file, name):
     zip_name = name[:128].replace(',','-')
     ste.download_button(
@@ -827,15 +941,19 @@ def main():
         date_string,
         max_cloud_percent,
         satellite_sensor_params["collection_name"],
-        satellite_sensor_params["platforms"]
+        satellite_sensor_params["platforms"],
+        satellite_sensor_params.get("query_filters"),
+        satellite_sensor_params.get("polarizations"),
+        satellite_sensor_params.get("search_assets")
     )
 
     col1, col2 = st.columns(2)
     if len(stac_items) == 0:
         warning_area_user_input.write(f":red[Search returned no results, change date or max cloud cover]")
     if len(stac_items) > 0:
-        image_data = mosaic_render(
-            stac_items,
+        mosaic_plan = plan_mosaic(stac_items, st.session_state["geometry"], buffer_width)
+        render_args = (
+            mosaic_plan["items"],
             st.session_state["geometry"],
             buffer_width,
             satellite_sensor_params,
@@ -847,25 +965,42 @@ def main():
             enhance_passes,
             compute_min_max,
             create_contour,
-            contour_gap,
-            max_size_pixels
+            contour_gap
         )
+        preview_max_size = get_preview_max_size(max_size_pixels)
+        tile_mode = worker_tile_server is not None \
+            and not (enhance_image or compute_min_max or create_contour)
+        if tile_mode:
+            image_data = {
+                "name": ", ".join(sorted(item["id"] for item in mosaic_plan["items"])),
+                "min_value": image_range[0],
+                "max_value": image_range[1]
+            }
+        else:
+            image_data = mosaic_render(
+                *render_args,
+                preview_max_size,
+                zip_file=preview_max_size == max_size_pixels
+            )
         st.write(f'Image ID: {image_data["name"][:1024]}')
+        if mosaic_plan["coverage"] is not None:
+            st.write(
+                f'Expected coverage: {mosaic_plan["coverage"]:.1%} '
+                f'using {len(mosaic_plan["items"])} of {len(stac_items)} images'
+            )
         with col1:
-            create_download_zip_button(image_data["zip_file"], image_data["name"])
-
-        image_bounds = image_data["bounds"]
+            if image_data.get("zip_file"):
+                create_download_zip_button(image_data["zip_file"], image_data["name"])
+            elif st.button("Prepare full resolution download"):
+                if image_data.get("full_resolution"):
+                    # the preview was not downsampled, zip it instead of reading again
+                    zip_file = worker_image_renderer.create_zip_from_render(
+                        image_data, get_render_params(*render_args, preview_max_size))
+                    create_download_zip_button(zip_file, image_data["name"])
+                else:
+                    download_data = mosaic_render(*render_args, max_size_pixels, zip_file=True)
+                    create_download_zip_button(download_data["zip_file"], download_data["name"])
 
-        with col2:
-            if georreference_image:
-                image_bounds = georreference_image_menu(image_bounds)
-
-        web_map.add_image(
-            image_data["image"],
-            image_bounds,
-            satellite_sensor_params["name"],
-            opacity
-        )
         feature_geojson = {
             "type": "Feature",
             "properties": {},
@@ -875,11 +1010,40 @@ def main():
                 buffer_width
             )
         }
+        if tile_mode:
+            layer_id = worker_tile_server.register_layer(
+                get_render_params(*render_args, None, zip_file=False))
+            web_map.add_tile_layer(
+                worker_tile_server.get_tile_url(layer_id),
+                satellite_sensor_params["name"],
+                opacity,
+                bounds=get_geometry_bounds(feature_geojson["geometry"]),
+                max_native_zoom=app_config_data.tile_server_max_zoom
+            )
+        else:
+            image_bounds = image_data["bounds"]
+
+            with col2:
+                if georreference_image:
+                    image_bounds = georreference_image_menu(image_bounds)
+
+            web_map.add_image(
+                image_data["image"],
+                image_bounds,
+                satellite_sensor_params["name"],
+                opacity,
+                image_format=app_config_data.map_overlay_format,
+                quality=app_config_data.map_overlay_quality
+            )
         web_map.add_polygon(feature_geojson)
         if create_contour:
             web_map.add_contour(image_data["contours"])
         with col1:
             st.write(f"Min/Max values input: {image_data['min_value']:.2f}/{image_data['max_value']:.2f}")
+        if app_config_data.show_render_timings and image_data.get("stage_timings"):
+            with st.expander("Render timings (s)"):
+                st.write(image_data["stage_timings"])
+                st.write(image_data.get("read_timings", {}))
 
     with col1:
         if st.session_state["result_gif_image"]:
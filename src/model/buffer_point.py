@@ -1,4 +1,6 @@
+import numpy as np
 import pyproj
+import shapely
 from shapely.geometry import Point
 from shapely.geometry.polygon import Polygon
 from shapely.geometry import shape
@@ -46,3 +48,26 @@ class BufferPoint:
         input_point = self.__lat_long_to_point_meters(latitude, longitude)
         buffered_point = self.__buffer_point(input_point, buffer_distance)
         return self.__buffer_to_geojson(buffered_point)
+
+    @staticmethod
+    def __ring_as_geojson(coordinates):
+        # point buffers are single ring polygons, empty when the distance is not positive
+        if not len(coordinates):
+            return {"type": "Polygon", "coordinates": ()}
+        return {"type": "Polygon", "coordinates": (tuple(map(tuple, coordinates.tolist())),)}
+
+    def buffer_many(self, latitudes, longitudes, buffer_distance=100):
+        # one projection call per direction for all points instead of one per vertex
+        longitudes, latitudes = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(longitudes, dtype=float)),
+            np.atleast_1d(np.asarray(latitudes, dtype=float)))
+        if not longitudes.size:
+            return []
+        x_values, y_values = self.transform_geo_to_projected(longitudes, latitudes)
+        buffered_points = shapely.buffer(
+            shapely.points(x_values, y_values), buffer_distance, quad_segs=16)
+        coordinates = shapely.get_coordinates(buffered_points)
+        coordinates = np.column_stack(
+            self.transform_project_to_geo(coordinates[:, 0], coordinates[:, 1]))
+        split_at = np.cumsum(shapely.get_num_coordinates(buffered_points))[:-1]
+        return [self.__ring_as_geojson(ring) for ring in np.split(coordinates, split_at)]
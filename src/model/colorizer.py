@@ -0,0 +1,33 @@
+import threading
+import numpy as np
+from rio_tiler.colormap import cmap
+
+
+class Colorizer:
+    def __init__(self):
+        self.__lookup_tables = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __make_lookup_table(color_map):
+        lookup_table = np.zeros((256, 4), dtype=np.uint8)
+        for value, color in color_map.items():
+            if 0 <= value < 256:
+                lookup_table[value] = color
+        return lookup_table
+
+    def get_lookup_table(self, colormap="gray"):
+        with self.__lock:
+            if colormap not in self.__lookup_tables:
+                self.__lookup_tables[colormap] = self.__make_lookup_table(cmap.get(colormap))
+            return self.__lookup_tables[colormap]
+
+    def colorize(self, array, mask, colormap="gray", use_colormap_alpha=False):
+        lookup_table = self.get_lookup_table(colormap)
+        colorized = lookup_table[np.asarray(array).astype(np.uint8)]
+        mask = np.asarray(mask).astype(np.uint8)
+        if use_colormap_alpha:
+            colorized[..., 3] = np.bitwise_and(colorized[..., 3], mask)
+        else:
+            colorized[..., 3] = mask
+        return colorized
@@ -0,0 +1,139 @@
+import math
+import numpy as np
+from skimage import measure
+
+try:
+    from osgeo import gdal, ogr
+except ImportError:
+    gdal = None
+    ogr = None
+
+
+class ContourGenerator:
+    def __init__(self, float_precision=7, use_gdal=True):
+        self.float_precision = float_precision
+        self.use_gdal = use_gdal and gdal is not None
+
+    @staticmethod
+    def __get_levels(min_value, max_value, interval):
+        first_level = math.ceil(min_value / interval)
+        last_level = math.floor(max_value / interval)
+        return [level * interval for level in range(first_level, last_level + 1)]
+
+    def __to_coordinates(self, line, bounds, shape):
+        xmin, ymin, xmax, ymax = bounds
+        height, width = shape
+        pixel_width = (xmax - xmin) / width
+        pixel_height = (ymax - ymin) / height
+        x = xmin + (line[:, 1] + 0.5) * pixel_width
+        y = ymax - (line[:, 0] + 0.5) * pixel_height
+        coordinates = np.round(np.column_stack((x, y)), self.float_precision)
+        return coordinates.tolist()
+
+    def __trace_levels_gdal(self, array, valid, levels, bounds):
+        # one ContourGenerateEx sweep writes every level to a memory layer
+        height, width = array.shape
+        xmin, ymin, xmax, ymax = bounds
+        nodata = float(array[valid].min()) - 1
+        raster = gdal.GetDriverByName("MEM").Create("", width, height, 1, gdal.GDT_Float64)
+        raster.SetGeoTransform(
+            (xmin, (xmax - xmin) / width, 0, ymax, 0, -(ymax - ymin) / height))
+        band = raster.GetRasterBand(1)
+        band.SetNoDataValue(nodata)
+        band.WriteArray(np.where(valid, array, nodata))
+
+        vector = ogr.GetDriverByName("Memory").CreateDataSource("")
+        layer = vector.CreateLayer("contours", geom_type=ogr.wkbLineString)
+        layer.CreateField(ogr.FieldDefn("ID", ogr.OFTInteger))
+        layer.CreateField(ogr.FieldDefn("pixel_value", ogr.OFTReal))
+        error = gdal.ContourGenerateEx(band, layer, options=[
+            f"FIXED_LEVELS={','.join(repr(float(level)) for level in levels)}",
+            f"NODATA={nodata!r}",
+            "ID_FIELD=0",
+            "ELEV_FIELD=1",
+        ])
+        if error:
+            raise RuntimeError("GDAL contour generation failed")
+
+        level_by_value = {float(level): level for level in levels}
+        lines_by_level = {level: [] for level in levels}
+        for feature in layer:
+            points = feature.GetGeometryRef().GetPoints() or []
+            if len(points) < 2:
+                continue
+            level = level_by_value[feature.GetField("pixel_value")]
+            lines_by_level[level].append([
+                [round(point[0], self.float_precision), round(point[1], self.float_precision)]
+                for point in points
+            ])
+        return lines_by_level
+
+    @staticmethod
+    def __get_pair_ranges(array, valid, axis):
+        # value range of each pair of neighbouring rows (axis=0) or columns
+        # (axis=1); a level can only cross cells whose pair range holds it
+        low = np.where(valid, array, np.inf).min(axis=1 - axis)
+        high = np.where(valid, array, -np.inf).max(axis=1 - axis)
+        return np.minimum(low[:-1], low[1:]), np.maximum(high[:-1], high[1:])
+
+    @staticmethod
+    def __get_span(pair_ranges, level):
+        pair_low, pair_high = pair_ranges
+        pairs = np.flatnonzero((pair_low <= level) & (pair_high >= level))
+        if not len(pairs):
+            return None
+        return pairs[0], pairs[-1] + 2
+
+    def __trace_levels_skimage(self, array, valid, levels, bounds):
+        row_ranges = self.__get_pair_ranges(array, valid, 0)
+        column_ranges = self.__get_pair_ranges(array, valid, 1)
+        lines_by_level = {}
+        for level in levels:
+            lines_by_level[level] = []
+            row_span = self.__get_span(row_ranges, level)
+            column_span = self.__get_span(column_ranges, level)
+            if row_span is None or column_span is None:
+                continue
+            window = (slice(*row_span), slice(*column_span))
+            offset = (row_span[0], column_span[0])
+            lines_by_level[level] = [
+                self.__to_coordinates(line + offset, bounds, array.shape)
+                for line in measure.find_contours(array[window], level, mask=valid[window])
+                if len(line) > 1
+            ]
+        return lines_by_level
+
+    @staticmethod
+    def __feature_collection(lines_by_level, levels):
+        features = []
+        for level in levels:
+            for coordinates in lines_by_level[level]:
+                features.append({
+                    "type": "Feature",
+                    "properties": {"ID": len(features), "pixel_value": level},
+                    "geometry": {"type": "LineString", "coordinates": coordinates}
+                })
+        return {"type": "FeatureCollection", "features": features}
+
+    def get_contours(self, array, mask, bounds, intervals=(10,)):
+        array = np.asarray(array, dtype=np.float64)
+        valid = np.ones(array.shape, dtype=bool) if mask is None else np.asarray(mask) != 0
+        valid &= np.isfinite(array)
+        if not valid.any():
+            return {interval: self.__feature_collection({}, []) for interval in intervals}
+
+        min_value = array[valid].min()
+        max_value = array[valid].max()
+        levels_by_interval = {
+            interval: self.__get_levels(min_value, max_value, interval)
+            for interval in intervals
+        }
+        all_levels = sorted(set().union(*levels_by_interval.values()))
+        if self.use_gdal:
+            lines_by_level = self.__trace_levels_gdal(array, valid, all_levels, bounds)
+        else:
+            lines_by_level = self.__trace_levels_skimage(array, valid, all_levels, bounds)
+        return {
+            interval: self.__feature_collection(lines_by_level, levels)
+            for interval, levels in levels_by_interval.items()
+        }
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import attr
+import rasterio
+from rio_tiler.io import Reader
+
+from model.metrics import metrics
+
+
+class DatasetPool:
+    def __init__(self, max_idle_datasets=64, idle_seconds=300):
+        self.max_idle_datasets = max_idle_datasets
+        self.idle_seconds = idle_seconds
+        self.opened = 0
+        self.reused = 0
+        self.expired = 0
+        self.__idle = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__idle)
+
+    @staticmethod
+    def __close(dataset):
+        try:
+            dataset.close()
+        except Exception:
+            pass
+
+    def __pop_expired(self, now):
+        expired = []
+        for entry_id, (_, dataset, checked_in_at) in list(self.__idle.items()):
+            if now - checked_in_at <= self.idle_seconds \
+                    and len(self.__idle) <= self.max_idle_datasets:
+                break
+            del self.__idle[entry_id]
+            expired.append(dataset)
+        if expired:
+            self.expired += len(expired)
+            metrics.increment("dataset_pool_total", len(expired), result="expired")
+        return expired
+
+    def __checkout(self, key):
+        with self.__lock:
+            expired = self.__pop_expired(time.monotonic())
+            dataset = None
+            for entry_id, (entry_key, entry_dataset, _) in self.__idle.items():
+                if entry_key == key:
+                    dataset = entry_dataset
+                    del self.__idle[entry_id]
+                    self.reused += 1
+                    metrics.increment("dataset_pool_total", result="reused")
+                    break
+        for expired_dataset in expired:
+            self.__close(expired_dataset)
+        return dataset
+
+    def __checkin(self, key, dataset):
+        with self.__lock:
+            self.__idle[id(dataset)] = (key, dataset, time.monotonic())
+            expired = self.__pop_expired(time.monotonic())
+        for expired_dataset in expired:
+            self.__close(expired_dataset)
+
+    @contextmanager
+    def checkout(self, href, scope=None):
+        key = (href, scope)
+        dataset = self.__checkout(key)
+        if dataset is None:
+            dataset = rasterio.open(href)
+            with self.__lock:
+                self.opened += 1
+            metrics.increment("dataset_pool_total", result="opened")
+        try:
+            yield dataset
+        except BaseException:
+            self.__close(dataset)
+            raise
+        if self.max_idle_datasets > 0:
+            self.__checkin(key, dataset)
+        else:
+            self.__close(dataset)
+
+    def clear(self):
+        with self.__lock:
+            datasets = [dataset for _, dataset, _ in self.__idle.values()]
+            self.__idle.clear()
+        for dataset in datasets:
+            self.__close(dataset)
+
+
+@attr.s
+class PooledReader(Reader):
+    dataset_pool: DatasetPool = attr.ib(default=None)
+    pool_scope: str = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        if not self.dataset and self.dataset_pool is not None:
+            self.dataset = self._ctx_stack.enter_context(
+                self.dataset_pool.checkout(self.input, self.pool_scope))
+        try:
+            super().__attrs_post_init__()
+        except BaseException as error:
+            # no __exit__ runs when the constructor fails, drop the handle here
+            self._ctx_stack.__exit__(type(error), error, error.__traceback__)
+            raise
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Reader.__exit__ closes the stack without the error, so a
+        # dataset that failed a read would go back to the pool
+        self._ctx_stack.__exit__(exc_type, exc_value, traceback)
@@ -0,0 +1,225 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+
+class DiskCache:
+    """Size bounded cache of files in a directory that can be shared.
+
+    Entries are written as npz files holding a JSON document plus the raw
+    arrays and bytes it points to, and read back with allow_pickle=False so
+    a shared directory never executes code from its files.
+    """
+
+    def __init__(self, directory, max_bytes, ttl_seconds=None, temp_grace_seconds=3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.temp_grace_seconds = temp_grace_seconds
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self.__remove_stale_temp_files()
+        self.__total_bytes = sum(size for _, size, _ in self.__list_entries())
+
+    @property
+    def total_bytes(self):
+        return self.__total_bytes
+
+    def __get_path(self, key):
+        file_name = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{file_name}.npz")
+
+    def __list_entries(self):
+        entries = []
+        with os.scandir(self.directory) as directory_entries:
+            for entry in directory_entries:
+                if not entry.name.endswith(".npz"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def __remove_stale_temp_files(self):
+        # a writer that died before os.replace leaves its temp file behind,
+        # newer ones may still be written by another process
+        stale_before = time.time() - self.temp_grace_seconds
+        with os.scandir(self.directory) as directory_entries:
+            for entry in directory_entries:
+                if not entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    if entry.stat().st_mtime < stale_before:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+
+    @staticmethod
+    def __get_size(path):
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    def __remove(self, path):
+        size = self.__get_size(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self.__lock:
+            self.__total_bytes = max(0, self.__total_bytes - size)
+
+    def __evict(self):
+        # other processes may share the directory, so the running total is
+        # only an estimate; rescan when it says the cache is over budget
+        with self.__lock:
+            if self.__total_bytes <= self.max_bytes:
+                return
+            self.__remove_stale_temp_files()
+            entries = sorted(self.__list_entries())
+            total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_bytes -= size
+            self.__total_bytes = total_bytes
+
+    @staticmethod
+    def __encode(value, blobs):
+        if isinstance(value, np.ndarray):
+            if value.dtype.hasobject:
+                raise TypeError("object arrays can not be stored without pickle")
+            name = f"blob_{len(blobs)}"
+            blobs[name] = value
+            return {"__array__": name}
+        if isinstance(value, (bytes, bytearray)):
+            name = f"blob_{len(blobs)}"
+            blobs[name] = np.frombuffer(bytes(value), dtype=np.uint8)
+            return {"__bytes__": name}
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, tuple):
+            return {"__tuple__": [DiskCache.__encode(item, blobs) for item in value]}
+        if isinstance(value, list):
+            return [DiskCache.__encode(item, blobs) for item in value]
+        if isinstance(value, dict):
+            if all(isinstance(key, str) and not key.startswith("__") for key in value):
+                return {key: DiskCache.__encode(item, blobs) for key, item in value.items()}
+            return {"__dict__": [
+                [DiskCache.__encode(key, blobs), DiskCache.__encode(item, blobs)]
+                for key, item in value.items()
+            ]}
+        return value
+
+    @staticmethod
+    def __decode(value, blobs):
+        if isinstance(value, list):
+            return [DiskCache.__decode(item, blobs) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if "__array__" in value:
+            return blobs[value["__array__"]]
+        if "__bytes__" in value:
+            return blobs[value["__bytes__"]].tobytes()
+        if "__tuple__" in value:
+            return tuple(DiskCache.__decode(item, blobs) for item in value["__tuple__"])
+        if "__dict__" in value:
+            return {
+                DiskCache.__decode(key, blobs): DiskCache.__decode(item, blobs)
+                for key, item in value["__dict__"]
+            }
+        return {key: DiskCache.__decode(item, blobs) for key, item in value.items()}
+
+    def __dumps(self, expires_at, value):
+        blobs = {}
+        document = json.dumps({"expires_at": expires_at, "value": self.__encode(value, blobs)})
+        blobs["document"] = np.frombuffer(document.encode(), dtype=np.uint8)
+        with io.BytesIO() as buffer:
+            np.savez(buffer, **blobs)
+            return buffer.getvalue()
+
+    def __load(self, path):
+        with np.load(path, allow_pickle=False) as content:
+            blobs = {name: content[name] for name in content.files}
+        document = json.loads(blobs.pop("document").tobytes())
+        return document["expires_at"], self.__decode(document["value"], blobs)
+
+    def __count_miss(self, default):
+        with self.__lock:
+            self.misses += 1
+        return default
+
+    def get(self, key, default=None):
+        path = self.__get_path(key)
+        try:
+            expires_at, value = self.__load(path)
+        except FileNotFoundError:
+            return self.__count_miss(default)
+        except (OSError, ValueError, KeyError):
+            self.__remove(path)
+            return self.__count_miss(default)
+
+        if expires_at is not None and expires_at < time.time():
+            self.__remove(path)
+            return self.__count_miss(default)
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        with self.__lock:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl_seconds=None):
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        try:
+            content = self.__dumps(expires_at, value)
+        except (TypeError, ValueError):
+            return False
+        if len(content) > self.max_bytes:
+            return False
+
+        path = self.__get_path(key)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as temp_file:
+                temp_file.write(content)
+            replaced_size = self.__get_size(path)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self.__lock:
+            self.__total_bytes += len(content) - replaced_size
+        self.__evict()
+        return True
+
+    def clear(self):
+        with self.__lock:
+            for _, _, path in self.__list_entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self.__total_bytes = 0
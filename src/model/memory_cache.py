@@ -0,0 +1,67 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCache:
+    def __init__(self, max_bytes, size_of=None):
+        self.max_bytes = max_bytes
+        self.size_of = size_of or self.__default_size_of
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __default_size_of(value):
+        if hasattr(value, "nbytes"):
+            return value.nbytes
+        if isinstance(value, (bytes, bytearray)):
+            return len(value)
+        return sys.getsizeof(value)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def __evict(self):
+        while self.current_bytes > self.max_bytes and self.__entries:
+            _, (_, size, _) = self.__entries.popitem(last=False)
+            self.current_bytes -= size
+
+    def get(self, key, default=None):
+        with self.__lock:
+            if key not in self.__entries:
+                self.misses += 1
+                return default
+            value, size, expires_at = self.__entries[key]
+            if expires_at is not None and expires_at < time.monotonic():
+                del self.__entries[key]
+                self.current_bytes -= size
+                self.misses += 1
+                return default
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds=None):
+        size = self.size_of(value)
+        if size > self.max_bytes:
+            return False
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds is not None else None
+        with self.__lock:
+            if key in self.__entries:
+                self.current_bytes -= self.__entries.pop(key)[1]
+            self.__entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+            self.__evict()
+        return True
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.current_bytes = 0
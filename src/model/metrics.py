@@ -0,0 +1,103 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageTimings:
+    def __init__(self, metrics, pipeline):
+        self.metrics = metrics
+        self.pipeline = pipeline
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start_time
+            self.timings[name] = round(self.timings.get(name, 0) + duration, 4)
+            self.metrics.observe(f"{self.pipeline}_stage_seconds", duration, stage=name)
+
+    def add_bytes(self, name, direction, size):
+        self.metrics.increment(f"{self.pipeline}_bytes_{direction}_total", size, stage=name)
+
+
+class Metrics:
+    def __init__(self):
+        self.__counters = {}
+        self.__summaries = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __get_key(name, labels):
+        # label values are strings in the exposition format, and mixed
+        # types such as None and str could not be sorted together
+        return (name, tuple(sorted(
+            (label, "" if value is None else str(value)) for label, value in labels.items())))
+
+    def increment(self, name, value=1, **labels):
+        key = self.__get_key(name, labels)
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = self.__get_key(name, labels)
+        with self.__lock:
+            count, total = self.__summaries.get(key, (0, 0))
+            self.__summaries[key] = (count + 1, total + value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, **labels)
+
+    def stage_timings(self, pipeline):
+        return StageTimings(self, pipeline)
+
+    def get_counter(self, name, **labels):
+        return self.__counters.get(self.__get_key(name, labels), 0)
+
+    def get_summary(self, name, **labels):
+        return self.__summaries.get(self.__get_key(name, labels), (0, 0))
+
+    @staticmethod
+    def __format_labels(labels):
+        if not labels:
+            return ""
+        escaped = [
+            (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for key, value in labels
+        ]
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+    def to_prometheus(self):
+        with self.__lock:
+            counters = sorted(self.__counters.items())
+            summaries = sorted(self.__summaries.items())
+
+        lines = []
+        typed_names = set()
+        for (name, labels), value in counters:
+            if name not in typed_names:
+                lines.append(f"# TYPE {name} counter")
+                typed_names.add(name)
+            lines.append(f"{name}{self.__format_labels(labels)} {value}")
+        for (name, labels), (count, total) in summaries:
+            if name not in typed_names:
+                lines.append(f"# TYPE {name} summary")
+                typed_names.add(name)
+            lines.append(f"{name}_sum{self.__format_labels(labels)} {total}")
+            lines.append(f"{name}_count{self.__format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self.__lock:
+            self.__counters.clear()
+            self.__summaries.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,57 @@
+from shapely.geometry import box
+from shapely.geometry import shape
+
+
+class PlanMosaic:
+    def __init__(self, min_contribution=0.01, coverage_tolerance=0.0001):
+        self.min_contribution = min_contribution
+        self.coverage_tolerance = coverage_tolerance
+
+    @staticmethod
+    def __get_footprint(item):
+        if item.get("geometry"):
+            return shape(item["geometry"])
+        if item.get("bbox"):
+            return box(*item["bbox"][:2], *item["bbox"][-2:])
+        return None
+
+    def plan(self, stac_items, geometry):
+        area_of_interest = shape(geometry)
+        total_area = area_of_interest.area
+        if not total_area:
+            return {
+                "items": stac_items,
+                "contributions": [None] * len(stac_items),
+                "coverage": None,
+                "skipped_items": 0
+            }
+
+        remaining = area_of_interest
+        selected_items = []
+        contributions = []
+        for item in stac_items:
+            if remaining.area / total_area <= self.coverage_tolerance:
+                break
+            footprint = self.__get_footprint(item)
+            if footprint is None:
+                selected_items.append(item)
+                contributions.append(None)
+                continue
+
+            contribution = remaining.intersection(footprint).area / total_area
+            if contribution < self.min_contribution:
+                continue
+            selected_items.append(item)
+            contributions.append(contribution)
+            remaining = remaining.difference(footprint)
+
+        if not selected_items and stac_items:
+            selected_items = stac_items[:1]
+            contributions = [None]
+
+        return {
+            "items": selected_items,
+            "contributions": contributions,
+            "coverage": 1 - remaining.area / total_area,
+            "skipped_items": len(stac_items) - len(selected_items)
+        }
@@ -1,45 +1,140 @@
 import io
 import zipfile
 import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
 from PIL import Image
 import numpy as np
+import morecantile
 import rasterio
-from rasterio import warp
-from rasterio.transform import Affine
-from rasterio.crs import CRS
+from rasterio import features, transform, warp
 from rio_tiler.io import STACReader
 from rio_tiler.models import ImageData
 from rio_tiler.mosaic import mosaic_reader
 from rio_tiler.colormap import cmap
+from rio_tiler.errors import EmptyMosaicError
 import numexpr as ne
-from ISR.models import RDN
-import subprocess
-import os
-import tempfile
 
-rdn = RDN(weights='psnr-small')
+from model.colorizer import Colorizer
+from model.contour_generator import ContourGenerator
+from model.dataset_pool import DatasetPool, PooledReader
+from model.memory_cache import MemoryCache
+from model.metrics import metrics
+from model.super_resolution import super_resolution
 
 class ReadSTAC:
-    def __init__(self, rdn_block_size=256):
+    def __init__(
+            self,
+            rdn_block_size=256,
+            image_data_cache_max_bytes=268435456,
+            item_threads=5,
+            asset_threads=3,
+            max_concurrent_reads=32,
+            enhance_warm_up=False,
+            dataset_pool_max_idle=64,
+            dataset_pool_idle_seconds=300
+        ):
         self.default_crs = "EPSG:4326"
         self.formats = {"PNG":"PGW", "JPEG":"JGW"}
         self.colormaps = cmap.list()
+        self.colorizer = Colorizer()
+        self.contour_generator = ContourGenerator()
         self.float_precision = 5
         self.rdn_block_size = rdn_block_size
+        self.super_resolution = super_resolution
+        self.metrics = metrics
+        if enhance_warm_up:
+            self.super_resolution.warm_up()
+        self.image_data_cache = MemoryCache(
+            max_bytes=image_data_cache_max_bytes,
+            size_of=self.__image_data_size
+        )
+        self.item_threads = item_threads
+        self.asset_threads = asset_threads
+        self.read_slots = threading.BoundedSemaphore(max_concurrent_reads)
+        self.dataset_pool = DatasetPool(
+            max_idle_datasets=dataset_pool_max_idle,
+            idle_seconds=dataset_pool_idle_seconds
+        )
+
+    @contextmanager
+    def __read_context(self, session=None, **options):
+        with self.read_slots:
+            with rasterio.Env(session=session, **options):
+                yield
 
     @staticmethod
-    def __tiler(item, *args, **kwargs):
-        with STACReader(None, item=item) as stac:
-            return stac.feature(*args, **kwargs)
+    def __get_pool_scope(session):
+        if session is None:
+            return None
+        return json.dumps(session.get_credential_options(), sort_keys=True)
+
+    def __tiler(self, item, *args, session=None, read_timings=None, reader_method="feature", **kwargs):
+        start_time = time.perf_counter()
+        with STACReader(
+            None,
+            item=item,
+            ctx=partial(self.__read_context, session),
+            reader=PooledReader,
+            reader_options={
+                "dataset_pool": self.dataset_pool,
+                "pool_scope": self.__get_pool_scope(session)
+            }
+        ) as stac:
+            reader = getattr(stac, reader_method)
+            image_data = reader(*args, threads=self.asset_threads, **kwargs)
+        if read_timings is not None:
+            read_timings[item.get("id")] = round(time.perf_counter() - start_time, 3)
+        return image_data
 
     @staticmethod
-    def __image_as_array(image):
-        image = io.BytesIO(image)
-        image = Image.open(image)
-        return np.asarray(image)
+    def __image_data_size(cached_value):
+        image_data, _ = cached_value
+        return image_data.array.data.nbytes + image_data.array.mask.nbytes
+
+    @staticmethod
+    def __get_image_data_key(params, view_type, view_params):
+        return json.dumps(
+            {
+                "items": [
+                    (item.get("collection"), item.get("id")) for item in params.get("stac_list")
+                ],
+                "geometry": params.get("feature_geojson"),
+                view_type: view_params,
+                "max_size": params.get("max_size"),
+                "nodata": params.get("nodata"),
+            },
+            sort_keys=True,
+            default=str
+        )
+
+    def __read_mosaic(self, params, view_type, view_params, session):
+        cache_key = self.__get_image_data_key(params, view_type, view_params)
+        cached_value = self.image_data_cache.get(cache_key)
+        if cached_value is not None:
+            return (*cached_value, {}, True)
+
+        read_timings = {}
+        args = (params.get("feature_geojson"), )
+        kwargs = {
+            view_type:  view_params,
+            "max_size": params.get("max_size"),
+            "nodata": params.get("nodata"),
+            "asset_as_band": True,
+            "session": session,
+            "read_timings": read_timings
+        }
+        image_data, assets_used = mosaic_reader(
+            params.get("stac_list"), self.__tiler, *args, threads=self.item_threads, **kwargs)
+        self.image_data_cache.set(cache_key, (image_data, assets_used))
+        return image_data, assets_used, read_timings, False
 
     @staticmethod
     def __array_to_img_bytes(image_array, image_format):
+        if image_format == "JPEG":
+            image_array = image_array[:, :, :3]
         image = Image.fromarray(image_array)
 
         with io.BytesIO() as buffer:
@@ -77,15 +172,13 @@ class ReadSTAC:
         return np.array(
             Image.fromarray(alpha_channel).resize((image.shape[1], image.shape[0]), Image.NEAREST))
 
-    def __enhance_image(self, image, params):
-        image = self.__image_as_array(image)
+    def __enhance_image(self, image):
         alpha_channel = image[:, :, 3]
-        image = rdn.predict(image[:,:,:3], by_patch_of_size=self.rdn_block_size)
+        image = self.super_resolution.predict(image[:,:,:3], block_size=self.rdn_block_size)
 
         alpha_channel_resized = self.__resize_alpha(alpha_channel, image)
 
-        image = np.dstack((image, alpha_channel_resized))
-        return self.__array_to_img_bytes(image, params.get("image_format", "PNG"))
+        return np.dstack((image, alpha_channel_resized))
 
     def __get_image_bounds(self, image):
         left, bottom, right, top = [round(i, self.float_precision) for i in image.bounds]
@@ -100,8 +193,8 @@ class ReadSTAC:
         bounds_4326 = [round(i, self.float_precision) for i in bounds_4326]
         return [[bounds_4326[1], bounds_4326[0]], [bounds_4326[3], bounds_4326[2]]]
 
-    def __get_world_file_content(self, image_bounds, image):
-        image = self.__image_as_array(image)
+    @staticmethod
+    def __get_world_file_content(image_bounds, image):
         return (
             f"{abs(image_bounds[0][1] - image_bounds[1][1]) / image.shape[1]}\n"
             f"0.0\n"
@@ -121,11 +214,25 @@ class ReadSTAC:
             zip_file.writestr(f"image.{extension_world_file}", world_file.encode())
             zip_file.writestr(f"polygon.geojson", json.dumps(geometry).encode())
             zip_file.writestr(f"image_metadata.geojson", json.dumps(image_metadata).encode())
-            if contours:
+            if contours.get("type") == "FeatureCollection":
                 zip_file.writestr(f"contours.geojson", json.dumps(contours).encode())
+            elif contours:
+                for interval, interval_contours in contours.items():
+                    zip_file.writestr(
+                        f"contours_{interval}.geojson", json.dumps(interval_contours).encode())
 
         return zip_buffer.getvalue()
 
+    def create_zip_from_render(self, image_data, params):
+        return self.__create_zip_geoimage(
+            image_data["image"],
+            image_data["projection_file"],
+            params.get("image_format"),
+            params.get("feature_geojson"),
+            image_data["assets_used"],
+            image_data["contours"]
+        )
+
     def __post_process_image(self, image_data, params):
         min_value = params.get("min_value")
         max_value = params.get("max_value")
@@ -149,31 +256,15 @@ class ReadSTAC:
         )
 
     def __render_image(self, image, params):
-        if params.get("assets"):
-            return image.render(img_format=params.get("image_format"))
-        if params.get("RGB-expression"):
-            return image.render(img_format=params.get("image_format"))
-
-        input_colormap = params.get("colormap", "viridis")
-        colormap = cmap.get(input_colormap)
-        return image.render(
-            img_format=params.get("image_format"),
-            colormap=colormap
-        )
-
-    @staticmethod
-    def __colorize_hillshade(hillshade, mask, colormap="gray"):
-        hillshade = hillshade.astype(np.uint8)
-
-        color_map = cmap.get(colormap)
-        colorized_hillshade = np.zeros((hillshade.shape[0], hillshade.shape[1], 4), dtype=np.uint8)
-
-        for value, color in color_map.items():
-            mask_value = hillshade == value
-            colorized_hillshade[mask_value, :3] = color[:3]
-
-        colorized_hillshade[:, :, 3] = mask
-        return colorized_hillshade
+        data = image.data
+        mask = image.mask
+        if not params.get("assets") and not params.get("RGB-expression"):
+            input_colormap = params.get("colormap", "viridis")
+            return self.colorizer.colorize(
+                data[0], mask, input_colormap, use_colormap_alpha=True)
+        if data.shape[0] == 1:
+            data = np.repeat(data, 3, axis=0)
+        return np.dstack((*data, mask)).astype(np.uint8)
 
     @staticmethod
     def __create_hillshade(arr, azimuth=30, altitude=30, exaggeration=100):
@@ -193,163 +284,157 @@ class ReadSTAC:
 
         return 255 * (shaded + 1) / 2
 
-    @staticmethod
-    def __get_contours(image_data, interval=10):
-        image_array = image_data.data.squeeze()
-
-        nodata_value = -12000
-        if image_data.mask is not None:
-            image_array[image_data.mask == 0] = nodata_value
-
-        height, width = image_array.shape
-
-        # Compute transform from bounds if available
-        transform = None
-        if image_data.bounds:
-            xmin, ymin, xmax, ymax = image_data.bounds
-            pixel_width = (xmax - xmin) / width
-            pixel_height = (ymax - ymin) / height
-            transform = Affine(pixel_width, 0, xmin,
-                            0, -pixel_height, ymax)
-
-        # Output file path
-        temp_input_tif = tempfile.NamedTemporaryFile(suffix=".tif", delete=False).name
-
-        with rasterio.open(
-            temp_input_tif,
-            'w',
-            driver='GTiff',
-            height=height,
-            width=width,
-            count=1,
-            dtype=image_array.dtype,
-            crs=CRS.from_epsg(4326),
-            transform=transform,
-            nodata=nodata_value
-        ) as dst:
-            dst.write(image_array, 1)
-
-        # Create a temporary GeoJSON file
-        temp_output_geojson = tempfile.NamedTemporaryFile(suffix=".geojson").name
-
-        try:
-            # Run gdal_contour command
-            command = [
-                "gdal_contour",
-                "-a",
-                "pixel_value",  # Attribute name for contour lines
-                "-i",
-                str(interval),  # Contour interval
-                "-snodata",
-                "-12000",
-                "-f",
-                "GeoJSON",  # Output format
-                temp_input_tif,
-                temp_output_geojson,
-            ]
-            subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-            # Read the generated GeoJSON file
-            with open(temp_output_geojson, 'r') as f:
-                geojson_data = json.load(f)
-
-        except subprocess.CalledProcessError as e:
-            print(f"Error running gdal_contour: {e}")
-            stdout = e.stdout.decode('utf-8')
-            stderr = e.stderr.decode('utf-8')
-            print(f"gdal_contour stdout:\n{stdout}")
-            print(f"gdal_contour stderr:\n{stderr}")
-            raise  # Re-raise the exception for handling at higher level
-
-        finally:
-            # Clean up: Delete temporary files
-            if os.path.exists(temp_input_tif):
-                os.remove(temp_input_tif)
-            if os.path.exists(temp_output_geojson):
-                os.remove(temp_output_geojson)
-
-        return geojson_data
+    def __get_contours(self, image_data, interval=10):
+        intervals = interval if isinstance(interval, (list, tuple)) else (interval,)
+        contours = self.contour_generator.get_contours(
+            image_data.data.squeeze(),
+            image_data.mask,
+            image_data.bounds,
+            intervals
+        )
+        if isinstance(interval, (list, tuple)):
+            return contours
+        return contours[interval]
 
     @staticmethod
-    def merge_altitude_and_hillshade(image_altitude_bytes, image_hillshade_bytes):
-        image1 = Image.open(io.BytesIO(image_altitude_bytes))
-        image2 = Image.open(io.BytesIO(image_hillshade_bytes))
+    def merge_altitude_and_hillshade(image_altitude, image_hillshade):
+        image1 = Image.fromarray(image_altitude)
+        image2 = Image.fromarray(image_hillshade)
         composite = Image.blend(image1, image2, alpha=0.5)  # Adjust alpha as needed
+        return np.asarray(composite)
+
+    def __get_tile_mask(self, geometry, tile_x, tile_y, tile_z, shape):
+        tms = morecantile.tms.get("WebMercatorQuad")
+        tile_bounds = tms.xy_bounds(morecantile.Tile(tile_x, tile_y, tile_z))
+        tile_geometry = warp.transform_geom(self.default_crs, tms.rasterio_crs, geometry)
+        return features.geometry_mask(
+            [tile_geometry],
+            out_shape=shape,
+            transform=transform.from_bounds(*tile_bounds, shape[1], shape[0]),
+            invert=True
+        )
 
-        buffer = io.BytesIO()
-        composite.save(buffer, format="PNG")
-        composite_bytes = buffer.getvalue()
-
-        return composite_bytes
-
-    def render_mosaic_from_stac(self, params):
-        if params.get("image_format") not in self.formats:
-            raise ValueError("Format not accepted")
-        feature_geojson = params.get("feature_geojson")
-        args = (feature_geojson, )
+    def render_tile_from_stac(self, params, tile_x, tile_y, tile_z, session=None):
         view_type, view_params  = self.__get_view_params(params)
         kwargs = {
-            view_type:  view_params,
-            "max_size": params.get("max_size"),
+            view_type: view_params,
+            "tilesize": params.get("tile_size", 256),
             "nodata": params.get("nodata"),
-            "asset_as_band": True
+            "asset_as_band": True,
+            "session": session,
+            "reader_method": "tile"
         }
-        image_data, assets_used = mosaic_reader(
-            params.get("stac_list"), self.__tiler, *args, **kwargs)
-        image_bounds = self.__get_image_bounds(image_data)
+        try:
+            image_data, _ = mosaic_reader(
+                params.get("stac_list"),
+                self.__tiler,
+                tile_x,
+                tile_y,
+                tile_z,
+                threads=self.item_threads,
+                **kwargs
+            )
+        except EmptyMosaicError:
+            return None
 
         if params.get("RGB-expression"):
             image_data = self.__process_rgb_expression(image_data, params)
+        image = self.__post_process_image(image_data, params)
+        image = self.__render_image(image, params)
+        feature_geojson = params.get("feature_geojson")
+        if feature_geojson:
+            # clip like the preview, which reads only inside the feature
+            tile_mask = self.__get_tile_mask(
+                feature_geojson.get("geometry", feature_geojson),
+                tile_x, tile_y, tile_z, image.shape[:2])
+            image[..., 3] = np.where(tile_mask, image[..., 3], 0)
+        return self.__array_to_img_bytes(image, "PNG")
+
+    def render_mosaic_from_stac(self, params, session=None):
+        if params.get("image_format") not in self.formats:
+            raise ValueError("Format not accepted")
+        timings = self.metrics.stage_timings("render")
+        view_type, view_params  = self.__get_view_params(params)
+        with timings.stage("read"):
+            image_data, assets_used, read_timings, cache_hit = self.__read_mosaic(
+                params, view_type, view_params, session)
+        if cache_hit:
+            self.metrics.increment("render_image_data_cache_hits_total")
+        else:
+            timings.add_bytes("read", "in", image_data.array.data.nbytes)
+        self.metrics.increment("render_items_total", len(assets_used))
+        image_bounds = self.__get_image_bounds(image_data)
+        # max_size never upsamples, a read smaller than it is the native size
+        full_resolution = not params.get("max_size") \
+            or max(image_data.height, image_data.width) < params.get("max_size")
+
+        if params.get("RGB-expression"):
+            with timings.stage("rgb_expression"):
+                image_data = self.__process_rgb_expression(image_data, params)
         min_value = params.get("min_value")
         max_value = params.get("max_value")
         if params.get("compute_min_max"):
-            min_value = round(
-                image_data.data[image_data.data!=params.get("nodata")].min(), self.float_precision)
-            max_value = round(
-                image_data.data[image_data.data!=params.get("nodata")].max(), self.float_precision)
+            with timings.stage("min_max"):
+                min_value = round(
+                    image_data.data[image_data.data!=params.get("nodata")].min(), self.float_precision)
+                max_value = round(
+                    image_data.data[image_data.data!=params.get("nodata")].max(), self.float_precision)
             params.update({"min_value": min_value, "max_value": max_value})
 
         if params.get("create_contour"):
-            image = self.__post_process_image(image_data, params)
+            with timings.stage("post_process"):
+                image = self.__post_process_image(image_data, params)
             params["colormap"] = "terrain"
-            image_altitude = self.__render_image(image, params)
-            image = self.__create_hillshade(image_data.data.squeeze())
-            image_hillshade = self.__array_to_img_bytes(
-                self.__colorize_hillshade(image, image_data.mask, "gray"),
-                params.get("image_format","PNG")
-            )
-            image = self.merge_altitude_and_hillshade(image_altitude, image_hillshade)
+            with timings.stage("render"):
+                image_altitude = self.__render_image(image, params)
+            with timings.stage("hillshade"):
+                image = self.__create_hillshade(image_data.data.squeeze())
+                image_hillshade = self.colorizer.colorize(image, image_data.mask, "gray")
+                image = self.merge_altitude_and_hillshade(image_altitude, image_hillshade)
 
         if not params.get("create_contour"):
-            image = self.__post_process_image(image_data, params)
-            image = self.__render_image(image, params)
+            with timings.stage("post_process"):
+                image = self.__post_process_image(image_data, params)
+            with timings.stage("render"):
+                image = self.__render_image(image, params)
 
         if params.get("enhance_image"):
             passes = params.get("enhance_passes", 1)
-            for step in range(passes):
-                image = self.__enhance_image(image, params)
+            with timings.stage("enhance"):
+                for step in range(passes):
+                    image = self.__enhance_image(image)
 
-        world_file = self.__get_world_file_content(image_bounds, image)
+        with timings.stage("world_file"):
+            world_file = self.__get_world_file_content(image_bounds, image)
         contours = {}
         if params.get("create_contour"):
             gap = params.get("gap", 10)
-            contours = self.__get_contours(
-                image_data,
-                gap
-            )
+            with timings.stage("contours"):
+                contours = self.__get_contours(
+                    image_data,
+                    gap
+                )
 
-        if params.get("zip_file"):
-            zip_file = self.__create_zip_geoimage(
-                image,
-                world_file,
-                params.get("image_format"),
-                params.get("feature_geojson"),
-                assets_used,
-                contours
-            )
+        if params.get("zip_file") or not params.get("image_as_array"):
+            with timings.stage("encode"):
+                image_bytes = self.__array_to_img_bytes(image, params.get("image_format"))
+            timings.add_bytes("encode", "out", len(image_bytes))
 
-        if params.get("image_as_array"):
-            image = self.__image_as_array(image)
+        if params.get("zip_file"):
+            with timings.stage("zip"):
+                zip_file = self.__create_zip_geoimage(
+                    image_bytes,
+                    world_file,
+                    params.get("image_format"),
+                    params.get("feature_geojson"),
+                    assets_used,
+                    contours
+                )
+            timings.add_bytes("zip", "out", len(zip_file))
+        self.metrics.increment("render_requests_total")
+
+        if not params.get("image_as_array"):
+            image = image_bytes
 
         if params.get("zip_file"):
             return {
@@ -359,6 +444,9 @@ class ReadSTAC:
                 "contours": contours,
                 "min_value": params.get("min_value"),
                 "max_value": params.get("max_value"),
+                "read_timings": read_timings,
+                "stage_timings": timings.timings,
+                "full_resolution": full_resolution,
                 "name": ", ".join(sorted([item["id"] for item in assets_used]))
             }
 
@@ -370,5 +458,8 @@ class ReadSTAC:
             "contours": contours,
             "min_value": params.get("min_value"),
             "max_value": params.get("max_value"),
+            "read_timings": read_timings,
+            "stage_timings": timings.timings,
+            "full_resolution": full_resolution,
             "name": ", ".join(sorted([item["id"] for item in assets_used]))
         }
\ No newline at end of file
@@ -1,12 +1,21 @@
+import threading
+import time
+import unicodedata
+
 import requests
 from requests.adapters import HTTPAdapter, Retry
 
+from model.metrics import metrics
+
 
 class SearchAddress:
-    def __init__(self, api_url, api_key):
+    def __init__(self, api_url, api_key, max_requests_per_second=None):
         self.api_url = api_url
         self.api_key = api_key
+        self.max_requests_per_second = max_requests_per_second
         self.session = self.__get_session()
+        self.__next_request_at = 0
+        self.__rate_lock = threading.Lock()
 
     @staticmethod
     def __get_session():
@@ -19,19 +28,44 @@ class SearchAddress:
         session.mount("https://", HTTPAdapter(max_retries=retries))
         return session
 
+    @staticmethod
+    def clean_address(address):
+        return " ".join(unicodedata.normalize("NFKC", address).split())
+
+    def __wait_for_request_slot(self):
+        if not self.max_requests_per_second:
+            return
+        with self.__rate_lock:
+            now = time.monotonic()
+            request_at = max(now, self.__next_request_at)
+            self.__next_request_at = request_at + 1 / self.max_requests_per_second
+        if request_at > now:
+            time.sleep(request_at - now)
+
     def __geocode(self, address):
         params = {
             "api_key": self.api_key,
-            "q": address,
+            "q": self.clean_address(address),
             "format": "json"
         }
+        self.__wait_for_request_slot()
         response = self.session.get(self.api_url, params=params)
-        if response.ok:
-            return response.json()
-        return {}
+        response.raise_for_status()
+        return response.json()
 
-    def search_address(self, address):
-        location = self.__geocode(address)
+    def find_location(self, address):
+        # None means the geocoder answered without a match,
+        # requests errors are raised so callers can tell them apart
+        with metrics.timer("geocode_seconds"):
+            location = self.__geocode(address)
+        metrics.increment("geocode_requests_total", found=bool(location))
         if location:
             return (location[0].get("lat", 0), location[0].get("lon", 0))
-        return (0,0)
+        return None
+
+    def search_address(self, address):
+        try:
+            location = self.find_location(address)
+        except requests.RequestException:
+            location = None
+        return location or (0,0)
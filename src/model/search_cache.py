@@ -0,0 +1,301 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from shapely.geometry import box, mapping, shape
+
+
+class SearchCache:
+    """STAC search results kept in a SQLite file with R-tree indexes.
+
+    A stored search answers a new one when it has the same signature and
+    covers the new area and date window. Searches cut at max_items only hold
+    every item newer than their oldest result (the cutoff), so a cached answer
+    is returned only when it does not depend on items older than that.
+
+    Replicas can share the file when they run on the same host. WAL needs
+    shared memory, so files on network filesystems fall back to the DELETE
+    journal, which relies on the filesystem locks; sharing one file between
+    hosts is not supported.
+    """
+
+    network_filesystems = (
+        "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "ceph", "glusterfs", "fuse.sshfs")
+
+    open_start = "0000-01-01T00:00:00"
+    open_end = "9999-12-31T23:59:59"
+
+    def __init__(
+            self,
+            path,
+            ttl_seconds=2592000,
+            open_ended_ttl_seconds=3600,
+            ingest_lag_days=3,
+            timeout_seconds=30
+        ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.open_ended_ttl_seconds = open_ended_ttl_seconds
+        self.ingest_lag_days = ingest_lag_days
+        self.timeout_seconds = timeout_seconds
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self.journal_mode = "DELETE" if self.is_network_filesystem(directory) else "WAL"
+        self.__create_tables()
+
+    @classmethod
+    def is_network_filesystem(cls, directory, mounts_path="/proc/mounts"):
+        try:
+            with open(mounts_path) as mounts:
+                lines = mounts.read().splitlines()
+        except OSError:
+            return False
+        directory = os.path.realpath(directory)
+        mount_point, file_system = "", ""
+        for line in lines:
+            fields = line.split()
+            if len(fields) < 3:
+                continue
+            # spaces in mount points are escaped as \040
+            point = fields[1].replace("\\040", " ")
+            inside = directory == point or directory.startswith(point.rstrip("/") + "/")
+            if inside and len(point) >= len(mount_point):
+                mount_point, file_system = point, fields[2]
+        return file_system in cls.network_filesystems
+
+    def __get_connection(self):
+        connection = getattr(self.__local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout_seconds)
+            connection.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.__local.connection = connection
+        return connection
+
+    def __create_tables(self):
+        with self.__get_connection() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS searches (
+                    id INTEGER PRIMARY KEY,
+                    signature TEXT NOT NULL,
+                    start TEXT NOT NULL,
+                    end TEXT NOT NULL,
+                    cutoff TEXT,
+                    expires_at REAL NOT NULL,
+                    geometry TEXT
+                );
+                CREATE INDEX IF NOT EXISTS searches_signature ON searches (signature);
+                CREATE VIRTUAL TABLE IF NOT EXISTS search_bounds
+                    USING rtree(id, min_x, max_x, min_y, max_y);
+                CREATE TABLE IF NOT EXISTS items (
+                    id INTEGER PRIMARY KEY,
+                    signature TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    datetime TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    item TEXT NOT NULL,
+                    UNIQUE (signature, item_id)
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS item_bounds
+                    USING rtree(id, min_x, max_x, min_y, max_y);
+            """)
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(searches)")]
+            # files written before the searched geometry was kept never cover a search
+            if "geometry" not in columns:
+                connection.execute("ALTER TABLE searches ADD COLUMN geometry TEXT")
+
+    @staticmethod
+    def __normalize_datetime(value):
+        return value.replace(" ", "T").rstrip("Z")[:19]
+
+    def get_date_window(self, date_string):
+        if not date_string:
+            return self.open_start, self.open_end
+        dates = date_string.split("/")
+        start, end = dates[0], dates[-1]
+        if start in ("", ".."):
+            start = self.open_start
+        elif len(start) == 10:
+            start = f"{start}T00:00:00"
+        if end in ("", ".."):
+            end = self.open_end
+        elif len(end) == 10:
+            end = f"{end}T23:59:59"
+        return self.__normalize_datetime(start), self.__normalize_datetime(end)
+
+    def __get_item_datetime(self, item):
+        properties = item.get("properties") or {}
+        value = properties.get("datetime") or properties.get("start_datetime") or ""
+        return self.__normalize_datetime(value)
+
+    @staticmethod
+    def __get_bbox_bounds(bbox):
+        # 3D bboxes carry the elevation after each corner
+        half = len(bbox) // 2
+        return bbox[0], bbox[1], bbox[half], bbox[half + 1]
+
+    def __get_item_bounds(self, item):
+        if item.get("bbox"):
+            min_x, min_y, max_x, max_y = self.__get_bbox_bounds(item["bbox"])
+        elif item.get("geometry"):
+            min_x, min_y, max_x, max_y = shape(item["geometry"]).bounds
+        else:
+            return None
+        return min_x, max_x, min_y, max_y
+
+    def __intersects(self, item, geometry):
+        if item.get("geometry"):
+            return shape(item["geometry"]).intersects(geometry)
+        if item.get("bbox"):
+            return box(*self.__get_bbox_bounds(item["bbox"])).intersects(geometry)
+        return False
+
+    def __get_ttl(self, end):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        settled = (now - timedelta(days=self.ingest_lag_days)).strftime("%Y-%m-%dT%H:%M:%S")
+        # new scenes can still be ingested into windows reaching the recent past
+        if end >= settled:
+            return self.open_ended_ttl_seconds
+        return self.ttl_seconds
+
+    def __find_cutoff(self, connection, signature, geometry, start, end, now):
+        min_x, min_y, max_x, max_y = geometry.bounds
+        rows = connection.execute("""
+            SELECT searches.cutoff, searches.geometry FROM searches
+            JOIN search_bounds ON search_bounds.id = searches.id
+            WHERE searches.signature = ? AND searches.expires_at > ?
+            AND searches.start <= ? AND searches.end >= ?
+            AND search_bounds.min_x <= ? AND search_bounds.max_x >= ?
+            AND search_bounds.min_y <= ? AND search_bounds.max_y >= ?
+        """, (signature, now, start, end, min_x, max_x, min_y, max_y)).fetchall()
+        # the bounds only prefilter, a polygon does not cover all of its bbox
+        cutoffs = [
+            cutoff for cutoff, searched in rows
+            if searched and shape(json.loads(searched)).covers(geometry)
+        ]
+        if not cutoffs:
+            return False, None
+        if None in cutoffs:
+            return True, None
+        return True, min(cutoffs)
+
+    def __count_miss(self):
+        with self.__lock:
+            self.misses += 1
+        return None
+
+    def __count_hit(self, results):
+        with self.__lock:
+            self.hits += 1
+        return results
+
+    def get(self, signature, geometry, date_string, max_items=None):
+        geometry = shape(geometry)
+        start, end = self.get_date_window(date_string)
+        now = time.time()
+        connection = self.__get_connection()
+        covered, cutoff = self.__find_cutoff(
+            connection, signature, geometry, start, end, now)
+        if not covered:
+            return self.__count_miss()
+
+        min_x, min_y, max_x, max_y = geometry.bounds
+        rows = connection.execute("""
+            SELECT items.datetime, items.item FROM items
+            JOIN item_bounds ON item_bounds.id = items.id
+            WHERE items.signature = ? AND items.expires_at > ?
+            AND items.datetime >= ? AND items.datetime <= ?
+            AND item_bounds.min_x <= ? AND item_bounds.max_x >= ?
+            AND item_bounds.min_y <= ? AND item_bounds.max_y >= ?
+            ORDER BY items.datetime DESC
+        """, (signature, now, start, end, max_x, min_x, max_y, min_y))
+
+        results = []
+        last_datetime = None
+        for item_datetime, content in rows:
+            item = json.loads(content)
+            if not self.__intersects(item, geometry):
+                continue
+            results.append(item)
+            last_datetime = item_datetime
+            if max_items and len(results) >= max_items:
+                break
+
+        complete = cutoff is None or cutoff < start
+        if not complete and not (
+                max_items and len(results) >= max_items and last_datetime > cutoff):
+            return self.__count_miss()
+        return self.__count_hit(results)
+
+    def set(self, signature, geometry, date_string, items, truncated=False):
+        geometry = shape(geometry)
+        min_x, min_y, max_x, max_y = geometry.bounds
+        start, end = self.get_date_window(date_string)
+        item_datetimes = [self.__get_item_datetime(item) for item in items]
+        cutoff = None
+        if truncated:
+            if not items:
+                return False
+            cutoff = min(item_datetimes)
+        now = time.time()
+        expires_at = now + self.__get_ttl(end)
+
+        with self.__get_connection() as connection:
+            self.__delete_expired(connection, now)
+            cursor = connection.execute(
+                "INSERT INTO searches (signature, start, end, cutoff, expires_at, geometry) VALUES (?, ?, ?, ?, ?, ?)",
+                (signature, start, end, cutoff, expires_at, json.dumps(mapping(geometry)))
+            )
+            connection.execute(
+                "INSERT INTO search_bounds VALUES (?, ?, ?, ?, ?)",
+                (cursor.lastrowid, min_x, max_x, min_y, max_y)
+            )
+            for item, item_datetime in zip(items, item_datetimes):
+                item_bounds = self.__get_item_bounds(item)
+                if item_bounds is None:
+                    continue
+                content = json.dumps(item)
+                row = connection.execute(
+                    "SELECT id FROM items WHERE signature = ? AND item_id = ?",
+                    (signature, item["id"])
+                ).fetchone()
+                if row:
+                    connection.execute(
+                        "UPDATE items SET datetime = ?, expires_at = MAX(expires_at, ?), item = ? WHERE id = ?",
+                        (item_datetime, expires_at, content, row[0])
+                    )
+                    continue
+                cursor = connection.execute(
+                    "INSERT INTO items (signature, item_id, datetime, expires_at, item) VALUES (?, ?, ?, ?, ?)",
+                    (signature, item["id"], item_datetime, expires_at, content)
+                )
+                connection.execute(
+                    "INSERT INTO item_bounds VALUES (?, ?, ?, ?, ?)",
+                    (cursor.lastrowid, *item_bounds)
+                )
+        return True
+
+    @staticmethod
+    def __delete_expired(connection, now):
+        connection.execute(
+            "DELETE FROM search_bounds WHERE id IN (SELECT id FROM searches WHERE expires_at <= ?)",
+            (now,)
+        )
+        connection.execute("DELETE FROM searches WHERE expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM item_bounds WHERE id IN (SELECT id FROM items WHERE expires_at <= ?)",
+            (now,)
+        )
+        connection.execute("DELETE FROM items WHERE expires_at <= ?", (now,))
+
+    def clear(self):
+        with self.__get_connection() as connection:
+            for table in ("searches", "search_bounds", "items", "item_bounds"):
+                connection.execute(f"DELETE FROM {table}")
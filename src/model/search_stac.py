@@ -1,19 +1,120 @@
+import threading
+from itertools import islice
+
+import requests
 from pystac_client import Client
+from pystac_client.exceptions import APIError
+from pystac_client.stac_api_io import StacApiIO
+from requests.adapters import HTTPAdapter, Retry
+
+from model.metrics import metrics
 
 
 class SearchSTAC:
-    def __init__(self, stac_url):
+    def __init__(
+            self,
+            stac_url,
+            timeout_seconds=10,
+            max_retries=3,
+            backoff_factor=0.3,
+            pool_maxsize=10
+        ):
         self.stac_url = stac_url
-        self.client = self.connect_client(self.stac_url)
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+        self.__client = None
+        self.__conformance = {}
+        self.__lock = threading.Lock()
 
     @staticmethod
-    def connect_client(stac_url):
-        return Client.open(stac_url)
+    def connect_client(stac_url, stac_io=None, timeout=None):
+        return Client.open(stac_url, stac_io=stac_io, timeout=timeout)
+
+    def __get_stac_io(self):
+        stac_io = StacApiIO(max_retries=None)
+        stac_io.update(timeout=self.timeout_seconds)
+        # searches are POSTed but are safe to repeat
+        retries = Retry(total=self.max_retries,
+                        backoff_factor=self.backoff_factor,
+                        status_forcelist=[ 429, 500, 502, 503, 504 ],
+                        allowed_methods=["GET", "POST"])
+        adapter = HTTPAdapter(max_retries=retries, pool_maxsize=self.pool_maxsize)
+        stac_io.session.mount("http://", adapter)
+        stac_io.session.mount("https://", adapter)
+        return stac_io
+
+    @property
+    def client(self):
+        # opened on first use so a slow endpoint does not block start up
+        if self.__client is None:
+            with self.__lock:
+                if self.__client is None:
+                    with metrics.timer("stac_connect_seconds"):
+                        self.__client = self.connect_client(
+                            self.stac_url, self.__get_stac_io(), self.timeout_seconds)
+        return self.__client
+
+    def conforms_to(self, conformance_class):
+        # the landing page is read once with the client, so each class is checked once
+        if conformance_class not in self.__conformance:
+            self.__conformance[conformance_class] = self.client.conforms_to(conformance_class)
+        return self.__conformance[conformance_class]
+
+    def reset_client(self):
+        with self.__lock:
+            self.__client = None
+
+    @staticmethod
+    def __prune_item(item, fields):
+        # servers without the fields extension send whole items, trim them here
+        include = fields.get("include") or []
+        top_level = {name for name in include if "." not in name}
+        nested = {}
+        for name in include:
+            if "." in name:
+                parent, child = name.split(".", 1)
+                nested.setdefault(parent, set()).add(child)
+        pruned = {}
+        for key, value in item.items():
+            if key in top_level:
+                pruned[key] = value
+            elif key in nested and isinstance(value, dict):
+                pruned[key] = {
+                    name: child for name, child in value.items() if name in nested[key]
+                }
+        return pruned
+
+    def __search(self, **kwargs):
+        yielded = False
+        try:
+            for item in self.client.search(**kwargs).items_as_dicts():
+                yielded = True
+                yield item
+            return
+        except (APIError, requests.RequestException):
+            metrics.increment("stac_client_errors_total")
+            self.reset_client()
+            if yielded:
+                raise
+        # the endpoint may have dropped the connection, retry once with a new client
+        yield from self.client.search(**kwargs).items_as_dicts()
 
-    def __get_items(self, **kwargs):
-        return self.client.search(
-            **kwargs
-        ).item_collection()
+    def iter_items(self, **kwargs):
+        fields = kwargs.get("fields")
+        items = self.__search(**kwargs)
+        if not isinstance(fields, dict) or not fields.get("include"):
+            yield from items
+            return
+        for item in items:
+            yield self.__prune_item(item, fields)
 
-    def get_items(self, **kwargs):
-        return [item.to_dict() for item in self.__get_items(**kwargs)]
+    def get_items(self, item_filter=None, max_scanned_items=None, **kwargs):
+        if item_filter is None:
+            return list(self.iter_items(**kwargs))
+        # filtered items do not count towards max_items, so page lazily
+        # and stop as soon as enough matching items arrived
+        max_items = kwargs.pop("max_items", None)
+        items = islice(self.iter_items(**kwargs), max_scanned_items)
+        return list(islice(filter(item_filter, items), max_items))
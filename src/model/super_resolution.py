@@ -0,0 +1,50 @@
+import resource
+import sys
+import threading
+import time
+from importlib import import_module
+
+
+class SuperResolution:
+    def __init__(self, weights="psnr-small"):
+        self.weights = weights
+        self.model = None
+        self.load_seconds = None
+        self.max_rss_bytes_before_load = None
+        self.max_rss_bytes_after_load = None
+        self.__lock = threading.Lock()
+        self.__warm_up_thread = None
+
+    @staticmethod
+    def __max_rss_bytes():
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # linux reports kilobytes, macOS reports bytes
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    def __load_model(self):
+        self.max_rss_bytes_before_load = self.__max_rss_bytes()
+        start_time = time.perf_counter()
+        rdn = import_module("ISR.models").RDN
+        model = rdn(weights=self.weights)
+        self.load_seconds = time.perf_counter() - start_time
+        self.max_rss_bytes_after_load = self.__max_rss_bytes()
+        return model
+
+    def get_model(self):
+        if self.model is None:
+            with self.__lock:
+                if self.model is None:
+                    self.model = self.__load_model()
+        return self.model
+
+    def warm_up(self):
+        if self.model is None and self.__warm_up_thread is None:
+            self.__warm_up_thread = threading.Thread(target=self.get_model, daemon=True)
+            self.__warm_up_thread.start()
+        return self.__warm_up_thread
+
+    def predict(self, image, block_size=256):
+        return self.get_model().predict(image, by_patch_of_size=block_size)
+
+
+super_resolution = SuperResolution()
@@ -1,4 +1,8 @@
+import base64
+import io
 import folium
+import numpy as np
+from PIL import Image
 from folium.plugins import Draw, Fullscreen, MousePosition
 from streamlit_folium import st_folium
 from folium.plugins import LocateControl
@@ -48,6 +52,22 @@ class WebMap:
             overlay=False
         ).add_to(self.web_map)
 
+    def add_tile_layer(self, tile_url, name="satelite image", opacity=1, bounds=None, max_zoom=30, max_native_zoom=18):
+        options = {"bounds": bounds} if bounds else {}
+        folium.raster_layers.TileLayer(
+            name=name,
+            tiles=tile_url,
+            attr=name,
+            opacity=opacity,
+            max_zoom=max_zoom,
+            max_native_zoom=max_native_zoom,
+            show=True,
+            overlay=True,
+            **options
+        ).add_to(self.web_map)
+        if bounds:
+            self.web_map.fit_bounds(bounds, padding=(30, 30))
+
     def add_draw_support(self, polygon=True, retangle=True, marker=True, export=False):
         Draw(
             export=export,
@@ -80,7 +100,67 @@ class WebMap:
             return {"geometry":None}
         return {"geometry": user_data["all_drawings"][0]["geometry"]}
 
-    def add_image(self, image, image_bounds, name="satelite image", opacity=100):
+    @staticmethod
+    def __to_data_url(image_bytes, mime_type):
+        return f"data:{mime_type};base64,{base64.b64encode(image_bytes).decode()}"
+
+    @staticmethod
+    def __encode(image, image_format, **options):
+        with io.BytesIO() as buffer:
+            image.save(buffer, format=image_format, **options)
+            return buffer.getvalue()
+
+    def __jpeg_with_mask_url(self, image, quality):
+        width, height = image.size
+        image_jpeg = self.__encode(image.convert("RGB"), "JPEG", quality=quality)
+        alpha = image.getchannel("A")
+        if alpha.getextrema() == (255, 255):
+            return self.__to_data_url(image_jpeg, "image/jpeg")
+
+        mask_png = self.__encode(alpha, "PNG", optimize=True)
+        svg = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" '
+            f'xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            f'<defs><mask id="alpha">'
+            f'<image width="{width}" height="{height}" '
+            f'xlink:href="{self.__to_data_url(mask_png, "image/png")}"/>'
+            f'</mask></defs>'
+            f'<image width="{width}" height="{height}" mask="url(#alpha)" '
+            f'xlink:href="{self.__to_data_url(image_jpeg, "image/jpeg")}"/>'
+            f'</svg>'
+        )
+        return self.__to_data_url(svg.encode(), "image/svg+xml")
+
+    def get_image_url(self, image, image_format="PNG", quality=85):
+        image_format = image_format.upper()
+        if isinstance(image, (bytes, bytearray)) and image_format == "PNG":
+            return self.__to_data_url(bytes(image), "image/png")
+
+        if isinstance(image, (bytes, bytearray)):
+            image = Image.open(io.BytesIO(image))
+        else:
+            image = Image.fromarray(np.asarray(image, dtype=np.uint8))
+        image = image.convert("RGBA")
+
+        if image_format == "WEBP":
+            return self.__to_data_url(
+                self.__encode(image, "WEBP", quality=quality), "image/webp")
+        if image_format == "JPEG":
+            return self.__jpeg_with_mask_url(image, quality)
+        return self.__to_data_url(self.__encode(image, "PNG"), "image/png")
+
+    def add_image(
+            self,
+            image,
+            image_bounds,
+            name="satelite image",
+            opacity=100,
+            image_format="PNG",
+            quality=85
+        ):
+        if isinstance(image, (bytes, bytearray)) or image_format.upper() != "PNG":
+            image = self.get_image_url(image, image_format, quality)
 
         image_overlay = folium.raster_layers.ImageOverlay(
             image=image,
@@ -1,3 +1,4 @@
+import os
 from controller.address_searcher import AddressSearcher
 
 
@@ -26,3 +27,69 @@ def test_search_address_eerror(mocker):
 
     result = address_searcher.search_address(test_value)
     assert isinstance(result, tuple)
+
+def test_search_address_cache_normalized_keys(requests_mock, tmp_path):
+    geocoder = requests_mock.get(
+        "https://nominatim.openstreetmap.org/search.php", json=[{"lat": 1, "lon": 2}])
+    address_searcher = AddressSearcher(
+        api_url="https://nominatim.openstreetmap.org/search.php",
+        api_key="abcd",
+        cache_dir=str(tmp_path)
+    )
+    assert address_searcher.search_address("Baltimore") == (1, 2)
+    assert address_searcher.search_address(" baltimore  ") == (1, 2)
+    assert address_searcher.search_address("ＢＡＬＴＩＭＯＲＥ") == (1, 2)
+    assert geocoder.call_count == 1
+    assert address_searcher.cache.hits == 2
+
+    restarted_searcher = AddressSearcher(
+        api_url="https://nominatim.openstreetmap.org/search.php",
+        api_key="abcd",
+        cache_dir=str(tmp_path)
+    )
+    assert restarted_searcher.search_address("BALTIMORE") == (1, 2)
+    assert geocoder.call_count == 1
+
+def test_search_address_cache_negative_ttl(requests_mock, tmp_path):
+    geocoder = requests_mock.get("https://nominatim.openstreetmap.org/search.php", json=[])
+    address_searcher = AddressSearcher(
+        api_url="https://nominatim.openstreetmap.org/search.php",
+        api_key="abcd",
+        cache_dir=str(tmp_path),
+        negative_cache_ttl_seconds=0
+    )
+    assert address_searcher.search_address("teste 123 xysz") == (0, 0)
+    assert address_searcher.search_address("teste 123 xysz") == (0, 0)
+    assert geocoder.call_count == 2
+    assert not os.listdir(tmp_path)
+
+    address_searcher.negative_cache_ttl_seconds = 3600
+    address_searcher.search_address("teste 123 xysz")
+    address_searcher.search_address("teste 123 xysz")
+    assert geocoder.call_count == 3
+
+def test_search_address_cache_skips_errors(requests_mock, tmp_path):
+    geocoder = requests_mock.get("https://nominatim.openstreetmap.org/search.php", status_code=403)
+    address_searcher = AddressSearcher(
+        api_url="https://nominatim.openstreetmap.org/search.php",
+        api_key="abcd",
+        cache_dir=str(tmp_path)
+    )
+    assert address_searcher.search_address("Baltimore") == (0, 0)
+    assert address_searcher.search_address("Baltimore") == (0, 0)
+    assert geocoder.call_count == 2
+
+def test_search_addresses_in_order(mocker):
+    locations = {"baltimore": (1, 2), "sao paulo sp": (3, 4)}
+    search = mocker.patch(
+        "model.search_address.SearchAddress.search_address",
+        side_effect=lambda address: locations.get(" ".join(address.lower().split()), (0, 0))
+    )
+    address_searcher = AddressSearcher(
+        api_url="https://nominatim.openstreetmap.org/search.php", api_key="abcd", batch_threads=3)
+
+    results = address_searcher.search_addresses(
+        ["Baltimore", "Sao paulo SP", "nowhere", " baltimore", "Sao Paulo sp"])
+    assert results == [(1, 2), (3, 4), (0, 0), (1, 2), (3, 4)]
+    assert search.call_count == 3
+    assert address_searcher.search_addresses([]) == []
@@ -61,9 +61,10 @@ def test_init_class(mocker):
     assert isinstance(animation_creator, AnimationCreator)
 
 def test_create_gif(mocker, datestring, stac_item, sample_image, sample_image_gif, feature_geojson):
+    stac_item["properties"]["datetime"] = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
     mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
     mocker.patch("model.search_stac.SearchSTAC.get_items", return_value=[stac_item])
-    mocker.patch(
+    render = mocker.patch(
         "model.read_stac.ReadSTAC.render_mosaic_from_stac",
         return_value={"image":sample_image, "bounds":[[0,0],[100,100]]}
     )
@@ -88,6 +89,11 @@ def test_create_gif(mocker, datestring, stac_item, sample_image, sample_image_gi
     image_data = animation_creator.create_gif(params)
     assert isinstance(image_data["image"], type(sample_image_gif))
     assert isinstance(image_data["bounds"], list)
+    assert render.call_args.args[0]["max_size"] == 52
+    assert render.call_args.args[0]["feature_geojson"] == feature_geojson
+    assert params["feature_geojson"] == feature_geojson
+    assert "feature_geojson" not in params["image_render"]
+    assert "feature_geojson" not in params["image_search"]
 
 def test_create_gif_empty(mocker, datestring, stac_item, sample_image_gif, feature_geojson):
     mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
@@ -111,4 +117,192 @@ def test_create_gif_empty(mocker, datestring, stac_item, sample_image_gif, featu
     }
 
     with pytest.raises(ValueError):
-        image_data = animation_creator.create_gif(params)
\ No newline at end of file
+        image_data = animation_creator.create_gif(params)
+
+def test_create_gif_single_search_in_date_order(mocker, stac_item, sample_image, feature_geojson):
+    items = []
+    for day in ("2024-03-20", "2024-01-10", "2024-02-15", "2024-01-05"):
+        item = json.loads(json.dumps(stac_item))
+        item["id"] = day
+        item["properties"]["datetime"] = f"{day}T13:00:00Z"
+        items.append(item)
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    search = mocker.patch("model.search_stac.SearchSTAC.get_items", return_value=items)
+    render = mocker.patch(
+        "model.read_stac.ReadSTAC.render_mosaic_from_stac",
+        side_effect=lambda params, session=None: {
+            "image": sample_image,
+            "bounds": [[0,0],[100,100]],
+            "name": params["stac_list"][0]["id"]
+        }
+    )
+    catalog_searcher = CatalogSearcher(stac_url="test.ai")
+    image_renderer = ImageRenderer()
+    animation_creator = AnimationCreator(catalog_searcher, image_renderer, render_threads=3)
+    params = {
+        "feature_geojson": feature_geojson,
+        "date_string": "2024-01-01/2024-03-31",
+        "period_time_break": 30,
+        "image_search":{
+            "max_cloud_cover": 100,
+            "max_items": 1,
+            "collection": "sentinel-2-l2a"},
+        "image_render":{
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000,
+        }
+    }
+    image_data = animation_creator.create_gif(params)
+    rendered_items = sorted(
+        [call.args[0]["stac_list"] for call in render.call_args_list], key=lambda x: x[0]["id"])
+
+    assert search.call_count == 1
+    assert render.call_args.args[0]["max_size"] == 384
+    assert search.call_args.kwargs["datetime"] == "2024-01-01/2024-03-31"
+    assert rendered_items == [[items[1]], [items[2]], [items[0]]]
+    assert Image.open(io.BytesIO(image_data["image"])).n_frames == 3
+
+
+def test_create_gif_pages_search_back_in_time(mocker, stac_item, sample_image, feature_geojson):
+    items = []
+    for day in ("2024-03-25", "2024-03-24", "2024-03-23", "2024-03-22", "2024-03-21",
+                "2024-02-15", "2024-01-10"):
+        item = json.loads(json.dumps(stac_item))
+        item["id"] = day
+        item["properties"]["datetime"] = f"{day}T13:00:00Z"
+        items.append(item)
+
+    def get_items(**kwargs):
+        start, end = kwargs["datetime"].split("/")
+        found = [item for item in items if start <= item["id"] <= end]
+        return found[:kwargs["max_items"]]
+
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    search = mocker.patch("model.search_stac.SearchSTAC.get_items", side_effect=get_items)
+    render = mocker.patch(
+        "model.read_stac.ReadSTAC.render_mosaic_from_stac",
+        return_value={"image":sample_image, "bounds":[[0,0],[100,100]]}
+    )
+    catalog_searcher = CatalogSearcher(stac_url="test.ai")
+    animation_creator = AnimationCreator(catalog_searcher, ImageRenderer())
+    image_data = animation_creator.create_gif({
+        "feature_geojson": feature_geojson,
+        "date_string": "2024-01-01/2024-03-31",
+        "period_time_break": 30,
+        "image_search":{
+            "max_cloud_cover": 100,
+            "max_items": 1,
+            "collection": "sentinel-2-l2a"},
+        "image_render":{
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000,
+        }
+    })
+    rendered_items = sorted(call.args[0]["stac_list"][0]["id"] for call in render.call_args_list)
+
+    assert [call.kwargs["max_items"] for call in search.call_args_list] == [3, 2, 2]
+    assert search.call_args.kwargs["datetime"] == "2024-01-01/2024-03-20"
+    assert rendered_items == ["2024-01-10", "2024-02-15", "2024-03-25"]
+    assert Image.open(io.BytesIO(image_data["image"])).n_frames == 3
+
+
+def test_create_gif_reuses_cached_frames(mocker, stac_item, sample_image, feature_geojson):
+    items = []
+    for day in ("2024-01-10", "2024-02-10", "2024-03-10"):
+        item = json.loads(json.dumps(stac_item))
+        item["id"] = day
+        item["properties"]["datetime"] = f"{day}T13:00:00Z"
+        items.append(item)
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    search = mocker.patch("model.search_stac.SearchSTAC.get_items", return_value=items)
+    render = mocker.patch(
+        "model.read_stac.ReadSTAC.render_mosaic_from_stac",
+        return_value={"image":sample_image, "bounds":[[0,0],[100,100]]}
+    )
+    catalog_searcher = CatalogSearcher(stac_url="test.ai")
+    image_renderer = ImageRenderer()
+    animation_creator = AnimationCreator(catalog_searcher, image_renderer)
+
+    def gif_params(time_per_image, width):
+        return {
+            "feature_geojson": feature_geojson,
+            "date_string": "2024-01-01/2024-03-31",
+            "period_time_break": 30,
+            "time_per_image": time_per_image,
+            "width": width,
+            "height": width,
+            "image_search":{
+                "max_cloud_cover": 100,
+                "collection": "sentinel-2-l2a"},
+            "image_render":{
+                "assets":("red", "green", "blue"),
+                "min_value": 0,
+                "max_value": 4000,
+            }
+        }
+
+    animation_creator.create_gif(gif_params(0.3, 300))
+    animation_creator.create_gif(gif_params(1, 300))
+    animation_creator.create_gif(gif_params(1, 290))
+    assert search.call_count == 1
+    assert render.call_count == 3
+
+    animation_creator.create_gif(gif_params(1, 500))
+    assert search.call_count == 2
+    assert render.call_count == 6
+
+def test_create_gif_expires_empty_and_recent_frames(
+        mocker, datestring, stac_item, sample_image, feature_geojson):
+    stac_item["properties"]["datetime"] = "2024-01-10T13:00:00Z"
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    search = mocker.patch("model.search_stac.SearchSTAC.get_items", return_value=[stac_item])
+    render = mocker.patch(
+        "model.read_stac.ReadSTAC.render_mosaic_from_stac",
+        return_value={"image":sample_image, "bounds":[[0,0],[100,100]]}
+    )
+    monotonic = mocker.patch("model.memory_cache.time.monotonic", return_value=1000.0)
+    catalog_searcher = CatalogSearcher(stac_url="test.ai")
+    image_renderer = ImageRenderer()
+    animation_creator = AnimationCreator(
+        catalog_searcher, image_renderer, frame_recent_ttl_seconds=60)
+
+    def gif_params(date_string="2024-01-01/2024-03-31"):
+        return {
+            "feature_geojson": feature_geojson,
+            "date_string": date_string,
+            "period_time_break": 30,
+            "image_search":{
+                "max_cloud_cover": 100,
+                "collection": "sentinel-2-l2a"},
+            "image_render":{
+                "assets":("red", "green", "blue"),
+                "min_value": 0,
+                "max_value": 4000,
+            }
+        }
+
+    animation_creator.create_gif(gif_params())
+    animation_creator.create_gif(gif_params())
+    assert search.call_count == 1
+    assert render.call_count == 1
+
+    later_item = json.loads(json.dumps(stac_item))
+    later_item["id"] = "later"
+    later_item["properties"]["datetime"] = "2024-03-10T13:00:00Z"
+    search.return_value = [later_item, stac_item]
+    monotonic.return_value = 1100.0
+    animation_creator.create_gif(gif_params())
+    assert search.call_count == 2
+    assert search.call_args.kwargs["datetime"] == "2024-01-31/2024-03-31"
+    assert render.call_count == 2
+
+    stac_item["properties"]["datetime"] = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    search.return_value = [stac_item]
+    animation_creator.create_gif(gif_params(datestring))
+    animation_creator.create_gif(gif_params(datestring))
+    assert render.call_count == 3
+    monotonic.return_value = 1200.0
+    animation_creator.create_gif(gif_params(datestring))
+    assert render.call_count == 4
@@ -40,6 +40,7 @@ def test_catalog_search(stac_url, feature_geojson, datestring, mocker):
 
 def test_catalog_search(stac_url, feature_geojson, datestring, mocker):
     mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    mocker.patch("model.search_stac.SearchSTAC.conforms_to", return_value=True)
     mocker.patch("model.search_stac.SearchSTAC.get_items", return_value=[])
     searcher = CatalogSearcher(stac_url)
     params = {
@@ -64,4 +65,231 @@ def test_catalog_search_platforms(stac_url, feature_geojson, datestring, mocker)
         "collection": "landsat-c2-l2",
         "platforms": ["landsat-5", "landsat-8"]
     }
-    assert searcher.search_images(params) == []
\ No newline at end of file
+    assert searcher.search_images(params) == []
+
+def sentinel1_filter_search(stac_url, feature_geojson, datestring, mocker):
+    items = [
+        {"id": "iw", "properties": {
+            "sar:instrument_mode": "IW", "sat:orbit_state": "descending",
+            "sar:polarizations": ["VV", "VH"]}},
+        {"id": "ew", "properties": {
+            "sar:instrument_mode": "EW", "sat:orbit_state": "descending",
+            "sar:polarizations": ["HH", "HV"]}},
+        {"id": "iw-hh", "properties": {
+            "sar:instrument_mode": "IW", "sat:orbit_state": "descending",
+            "sar:polarizations": ["HH", "HV"]}},
+    ]
+    get_items = mocker.patch(
+        "model.search_stac.SearchSTAC.get_items",
+        side_effect=lambda item_filter=None, **kwargs: list(filter(item_filter, items))
+    )
+    searcher = CatalogSearcher(stac_url)
+    params = {
+        "feature_geojson": feature_geojson,
+        "date_string": datestring,
+        "max_items": 3,
+        "collection": "sentinel-1-grd",
+        "query_filters": {
+            "sar:instrument_mode": {"eq": "IW"},
+            "sat:orbit_state": {"eq": "descending"}
+        },
+        "polarizations": ["VV", "VH"]
+    }
+    results = searcher.search_images(params)
+    return [result["id"] for result in results], get_items.call_args.kwargs
+
+def test_catalog_search_sentinel1_filters_server_side(stac_url, feature_geojson, datestring, mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    mocker.patch("model.search_stac.SearchSTAC.conforms_to", return_value=True)
+    _, kwargs = sentinel1_filter_search(stac_url, feature_geojson, datestring, mocker)
+
+    assert kwargs["query"] == {
+        "sar:instrument_mode": {"eq": "IW"},
+        "sat:orbit_state": {"eq": "descending"}
+    }
+    assert kwargs["filter"] == {
+        "op": "a_contains",
+        "args": [{"property": "sar:polarizations"}, ["VV", "VH"]]
+    }
+    assert kwargs["filter_lang"] == "cql2-json"
+    assert "item_filter" not in kwargs
+
+def test_catalog_search_sentinel1_filters_locally_without_conformance(
+        stac_url, feature_geojson, datestring, mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    conforms_to = mocker.patch("model.search_stac.SearchSTAC.conforms_to", return_value=False)
+    result_ids, kwargs = sentinel1_filter_search(stac_url, feature_geojson, datestring, mocker)
+
+    assert result_ids == ["iw"]
+    assert "filter" not in kwargs
+    assert kwargs["max_scanned_items"] == 30
+    assert sorted(call.args[0] for call in conforms_to.call_args_list) == ["FILTER", "QUERY"]
+
+def test_catalog_search_sentinel1_default_instrument_mode(stac_url, feature_geojson, datestring, mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    mocker.patch("model.search_stac.SearchSTAC.conforms_to", return_value=True)
+    get_items = mocker.patch("model.search_stac.SearchSTAC.get_items", return_value=[])
+    searcher = CatalogSearcher(stac_url)
+    params = {
+        "feature_geojson": feature_geojson,
+        "date_string": datestring,
+        "max_items": 3,
+        "collection": "sentinel-1-grd",
+    }
+    searcher.search_images(params)
+    assert get_items.call_args.kwargs["query"] == {"sar:instrument_mode": {"eq": "IW"}}
+    assert "filter" not in get_items.call_args.kwargs
+    assert "item_filter" not in get_items.call_args.kwargs
+
+def test_catalog_search_slim_responses_fields(stac_url, feature_geojson, datestring, mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    get_items = mocker.patch("model.search_stac.SearchSTAC.get_items", return_value=[])
+    searcher = CatalogSearcher(stac_url, slim_responses=True)
+    params = {
+        "feature_geojson": feature_geojson,
+        "date_string": datestring,
+        "max_items": 3,
+        "max_cloud_cover": 20,
+        "collection": "sentinel-2-l2a",
+        "assets": ["red", "green", "blue"]
+    }
+    searcher.search_images(params)
+    kwargs = get_items.call_args.kwargs
+    include = kwargs["fields"]["include"]
+
+    assert "item_filter" not in kwargs
+    assert {"id", "bbox", "geometry", "properties.datetime"} <= set(include)
+    assert "properties.eo:cloud_cover" in include
+    assert {"assets.red", "assets.green", "assets.blue"} <= set(include)
+    assert "links" not in include
+
+def test_catalog_search_without_slim_responses_has_no_fields(stac_url, feature_geojson, datestring, mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    get_items = mocker.patch("model.search_stac.SearchSTAC.get_items", return_value=[])
+    searcher = CatalogSearcher(stac_url)
+    searcher.search_images({
+        "feature_geojson": feature_geojson,
+        "date_string": datestring,
+        "max_items": 3,
+        "collection": "sentinel-2-l2a",
+        "assets": ["red"]
+    })
+    assert "fields" not in get_items.call_args.kwargs
+
+def test_catalog_search_uses_search_cache(stac_url, feature_geojson, tmp_path, mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    items = [{
+        "id": "a",
+        "bbox": [-180, -90, 180, 90],
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[-180, -90], [180, -90], [180, 90], [-180, 90], [-180, -90]]]
+        },
+        "properties": {"datetime": "2020-03-01T10:00:00Z"},
+    }]
+    get_items = mocker.patch("model.search_stac.SearchSTAC.get_items", return_value=items)
+    searcher = CatalogSearcher(stac_url, search_cache_path=str(tmp_path / "search.sqlite"))
+    params = {
+        "feature_geojson": {"type": "Feature", "properties": {}, "geometry": feature_geojson},
+        "date_string": "2020-01-01/2020-12-31",
+        "max_items": 3,
+        "max_cloud_cover": 20,
+        "collection": "sentinel-2-l2a",
+    }
+    assert searcher.search_images(params) == items
+    assert get_items.call_count == 1
+    assert get_items.call_args.kwargs["max_items"] == 6
+    assert get_items.call_args.kwargs["intersects"] != feature_geojson
+
+    assert searcher.search_images(params) == items
+    assert get_items.call_count == 1
+    searcher.search_images(dict(params, max_cloud_cover=50))
+    assert get_items.call_count == 2
+
+def test_catalog_search_batch(stac_url, feature_geojson, tmp_path, mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    mocker.patch("model.search_stac.SearchSTAC.conforms_to", return_value=False)
+    properties = {
+        "sentinel-2-l2a": [("s2", {})],
+        "landsat-c2-l2": [("landsat", {})],
+        "sentinel-1-grd": [
+            ("iw", {"sar:instrument_mode": "IW"}),
+            ("ew", {"sar:instrument_mode": "EW"}),
+        ],
+    }
+
+    def get_items(item_filter=None, **kwargs):
+        start_date = kwargs["datetime"].split("/")[0]
+        items = [
+            {
+                "id": f"{item_id}-{start_date}",
+                "bbox": [-180, -90, 180, 90],
+                "properties": dict(item_properties, datetime=f"{start_date}T10:00:00Z"),
+            }
+            for item_id, item_properties in properties[kwargs["collections"][0]]
+        ]
+        return list(filter(item_filter, items))
+
+    search = mocker.patch("model.search_stac.SearchSTAC.get_items", side_effect=get_items)
+    searcher = CatalogSearcher(
+        stac_url, search_threads=4, search_cache_path=str(tmp_path / "search.sqlite"))
+    queries = {
+        (collection, date_string): {
+            "feature_geojson": {"type": "Feature", "properties": {}, "geometry": feature_geojson},
+            "date_string": date_string,
+            "max_items": 3,
+            "max_cloud_cover": 20,
+            "collection": collection,
+        }
+        for collection in properties
+        for date_string in ("2024-01-01/2024-06-30", "2024-07-01/2024-12-31")
+    }
+    results = searcher.search_images_batch(queries)
+
+    assert list(results) == list(queries)
+    assert search.call_count == 6
+    assert [item["id"] for item in results[("sentinel-2-l2a", "2024-01-01/2024-06-30")]] == [
+        "s2-2024-01-01"]
+    assert [item["id"] for item in results[("landsat-c2-l2", "2024-07-01/2024-12-31")]] == [
+        "landsat-2024-07-01"]
+    assert [item["id"] for item in results[("sentinel-1-grd", "2024-01-01/2024-06-30")]] == [
+        "iw-2024-01-01"]
+
+    assert searcher.search_images_batch(queries) == results
+    assert search.call_count == 6
+    assert searcher.search_images_batch({}) == {}
+
+def test_catalog_search_cache_keys_local_polarizations(stac_url, feature_geojson, tmp_path, mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=None)
+    mocker.patch("model.search_stac.SearchSTAC.conforms_to", return_value=False)
+    geometry = {
+        "type": "Polygon",
+        "coordinates": [[[-180, -90], [180, -90], [180, 90], [-180, 90], [-180, -90]]]
+    }
+    items = [
+        {"id": "a", "bbox": [-180, -90, 180, 90], "geometry": geometry, "properties": {
+            "datetime": "2020-03-02T10:00:00Z", "sar:instrument_mode": "IW",
+            "sar:polarizations": ["VV"]}},
+        {"id": "b", "bbox": [-180, -90, 180, 90], "geometry": geometry, "properties": {
+            "datetime": "2020-03-01T10:00:00Z", "sar:instrument_mode": "IW",
+            "sar:polarizations": ["VV", "VH"]}},
+    ]
+    get_items = mocker.patch(
+        "model.search_stac.SearchSTAC.get_items",
+        side_effect=lambda item_filter=None, **kwargs: list(filter(item_filter, items))
+    )
+    searcher = CatalogSearcher(stac_url, search_cache_path=str(tmp_path / "search.sqlite"))
+    params = {
+        "feature_geojson": {"type": "Feature", "properties": {}, "geometry": feature_geojson},
+        "date_string": "2020-01-01/2020-12-31",
+        "max_items": 3,
+        "collection": "sentinel-1-grd",
+    }
+    vv = searcher.search_images(dict(params, polarizations=["VV"]))
+    assert [item["id"] for item in vv] == ["a", "b"]
+    vv_vh = searcher.search_images(dict(params, polarizations=["VV", "VH"]))
+    assert [item["id"] for item in vv_vh] == ["b"]
+    assert get_items.call_count == 2
+
+    searcher.search_images(dict(params, polarizations=["VV", "VH"]))
+    assert get_items.call_count == 2
@@ -1,3 +1,4 @@
+import os
 import pytest
 import json
 import zipfile
@@ -78,3 +79,60 @@ def test_render_mosaic_zip(mocker, stac_list, feature_geojson, sample_image_zip)
     }
     image_data = image_renderer.render_mosaic_from_stac(params)
     assert isinstance(image_data["zip_file"], type(sample_image_zip))
+
+def test_aws_session_from_params():
+    image_renderer = ImageRenderer()
+    params = {
+        "aws_access_key_id": "key-id",
+        "aws_secret_access_key": "secret",
+        "aws_region_name": "us-west-2",
+        "aws_request_payer": "requester",
+        "aws_no_sign_requests": "NO"
+    }
+    session = image_renderer.get_aws_session(params)
+    options = session.get_credential_options()
+    assert options["AWS_ACCESS_KEY_ID"] == "key-id"
+    assert options["AWS_REQUEST_PAYER"] == "requester"
+    assert options["AWS_REGION"] == "us-west-2"
+    assert image_renderer.get_aws_session(dict(params)) is session
+    assert os.environ.get("AWS_ACCESS_KEY_ID") != "key-id"
+
+def test_aws_session_unsigned():
+    image_renderer = ImageRenderer()
+    params = {"aws_region_name": "eu-central-1", "aws_no_sign_requests": "YES"}
+    options = image_renderer.get_aws_session(params).get_credential_options()
+    assert options == {"AWS_NO_SIGN_REQUEST": "YES", "AWS_REGION": "eu-central-1"}
+
+def test_render_mosaic_passes_session(mocker, stac_list, feature_geojson, sample_image):
+    render = mocker.patch(
+        "model.read_stac.ReadSTAC.render_mosaic_from_stac",
+        return_value={"image":sample_image, "bounds":[[0,0],[100,100]]}
+    )
+    image_renderer = ImageRenderer()
+    params = {
+        "stac_list":stac_list,
+        "geojson_geometry": feature_geojson,
+        "aws_no_sign_requests": "YES"
+    }
+    image_renderer.render_mosaic_from_stac(params)
+    assert render.call_args.kwargs["session"] is image_renderer.get_aws_session(params)
+
+def test_render_mosaic_uses_disk_cache(mocker, tmp_path, stac_list, feature_geojson, sample_image):
+    render = mocker.patch(
+        "model.read_stac.ReadSTAC.render_mosaic_from_stac",
+        return_value={"image":sample_image, "bounds":[[0,0],[100,100]], "zip_file": b"zip"}
+    )
+    params = {
+        "stac_list":stac_list,
+        "feature_geojson": feature_geojson,
+        "min_value": 0,
+        "aws_access_key_id": "key"
+    }
+    image_renderer = ImageRenderer(render_cache_dir=str(tmp_path))
+    image_renderer.render_mosaic_from_stac(dict(params))
+    image_renderer = ImageRenderer(render_cache_dir=str(tmp_path))
+    image_data = image_renderer.render_mosaic_from_stac(dict(params, aws_access_key_id="other"))
+    image_renderer.render_mosaic_from_stac(dict(params, min_value=10))
+
+    assert render.call_count == 2
+    assert image_data == {"image":sample_image, "bounds":[[0,0],[100,100]], "zip_file": b"zip"}
@@ -0,0 +1,23 @@
+import urllib.request
+import urllib.error
+import pytest
+from controller.metrics_server import MetricsServer
+from model.metrics import Metrics
+
+def test_init_metrics_server():
+    metrics_server = MetricsServer()
+    assert isinstance(metrics_server, MetricsServer)
+
+def test_metrics_server_http():
+    metrics = Metrics()
+    metrics.increment("render_requests_total")
+    metrics_server = MetricsServer(port=0, metrics_registry=metrics).start()
+    try:
+        url = f"http://127.0.0.1:{metrics_server.port}"
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            assert response.status == 200
+            assert "render_requests_total 1" in response.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other")
+    finally:
+        metrics_server.stop()
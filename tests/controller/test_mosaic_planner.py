@@ -0,0 +1,23 @@
+import pytest
+import json
+from controller.mosaic_planner import MosaicPlanner
+
+@pytest.fixture
+def stac_item():
+    with open("tests/data/stac_item.json") as test_data:
+        return json.load(test_data)
+
+@pytest.fixture
+def feature_geojson():
+    with open("tests/data/polygon_feature.geojson") as test_data:
+        return {"type": "Feature", "properties": {}, "geometry": json.load(test_data)}
+
+def test_init_mosaic_planner():
+    mosaic_planner = MosaicPlanner()
+    assert isinstance(mosaic_planner, MosaicPlanner)
+
+def test_plan_mosaic(stac_item, feature_geojson):
+    mosaic_planner = MosaicPlanner()
+    plan = mosaic_planner.plan([stac_item, stac_item], feature_geojson)
+    assert plan["items"] == [stac_item]
+    assert plan["coverage"] == pytest.approx(1)
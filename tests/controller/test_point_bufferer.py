@@ -23,3 +23,9 @@ def test_search_address(mocker, feature_geojson):
 
     result = point_bufferer.buffer(latitude, longitude, distance)
     assert isinstance(result, dict)
+
+def test_buffer_many():
+    point_bufferer = PointBufferer()
+    result = point_bufferer.buffer_many([10, 11], [100, 101], 10)
+    assert len(result) == 2
+    assert all(geometry["type"] == "Polygon" for geometry in result)
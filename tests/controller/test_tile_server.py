@@ -0,0 +1,114 @@
+import json
+import urllib.request
+import urllib.error
+import pytest
+from controller.image_renderer import ImageRenderer
+from controller.tile_server import TileServer
+
+@pytest.fixture
+def stac_list():
+    with open("tests/data/stac_item.json") as test_data:
+        return [json.load(test_data)]
+
+@pytest.fixture
+def feature_geojson():
+    with open("tests/data/polygon_feature.geojson") as test_data:
+        return {"type": "Feature", "properties": {}, "geometry": json.load(test_data)}
+
+@pytest.fixture
+def tile_params(stac_list, feature_geojson):
+    return {
+        "feature_geojson": feature_geojson,
+        "stac_list": stac_list,
+        "assets": ("red", "green", "blue"),
+        "min_value": 0,
+        "max_value": 4000
+    }
+
+def test_init_tile_server():
+    tile_server = TileServer(ImageRenderer())
+    assert isinstance(tile_server, TileServer)
+
+def test_tile_server_url(tile_params):
+    tile_server = TileServer(ImageRenderer(), host="localhost", port=9000)
+    layer_id = tile_server.register_layer(tile_params)
+    assert tile_server.get_tile_url(layer_id) == f"http://localhost:9000/{layer_id}/{{z}}/{{x}}/{{y}}.png"
+    tile_server.public_url = "https://tiles.example.com/"
+    assert tile_server.get_tile_url(layer_id).startswith(f"https://tiles.example.com/{layer_id}/")
+
+def test_tile_server_caches_tiles(mocker, tile_params):
+    render = mocker.patch(
+        "model.read_stac.ReadSTAC.render_tile_from_stac", return_value=b"png")
+    tile_server = TileServer(ImageRenderer())
+    layer_id = tile_server.register_layer(tile_params)
+    assert tile_server.get_tile(layer_id, 1534, 2294, 12) == b"png"
+    assert tile_server.get_tile(layer_id, 1534, 2294, 12) == b"png"
+    assert render.call_count == 1
+    assert render.call_args.args[1:4] == (1534, 2294, 12)
+
+def test_tile_server_skips_tiles_outside_layer(mocker, tile_params):
+    render = mocker.patch(
+        "model.read_stac.ReadSTAC.render_tile_from_stac", return_value=b"png")
+    tile_server = TileServer(ImageRenderer(), min_zoom=10, max_zoom=14)
+    layer_id = tile_server.register_layer(tile_params)
+    assert tile_server.get_tile(layer_id, 1, 2, 12) == b""
+    assert tile_server.get_tile(layer_id, 383, 573, 10) == b"png"
+    assert tile_server.get_tile(layer_id, 95, 143, 8) == b""
+    assert tile_server.get_tile(layer_id, 12276, 18356, 15) == b""
+    assert render.call_count == 1
+
+    layer_id = tile_server.register_layer(tile_params, min_zoom=8)
+    assert tile_server.get_tile(layer_id, 95, 143, 8) == b"png"
+    with pytest.raises(ValueError):
+        tile_server.register_layer({"stac_list": tile_params["stac_list"]})
+
+def test_tile_server_keeps_recent_layers(tile_params):
+    tile_server = TileServer(ImageRenderer(), max_layers=2)
+    layer_ids = [
+        tile_server.register_layer(dict(tile_params, min_value=value)) for value in range(3)]
+    assert list(tile_server.layers) == layer_ids[1:]
+
+def test_tile_server_http(mocker, tile_params):
+    mocker.patch(
+        "model.read_stac.ReadSTAC.render_tile_from_stac", side_effect=[b"png", None])
+    tile_server = TileServer(ImageRenderer(), port=0).start()
+    try:
+        layer_id = tile_server.register_layer(tile_params)
+        tile_url = tile_server.get_tile_url(layer_id)
+        with urllib.request.urlopen(tile_url.format(z=12, x=1534, y=2294)) as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"] == "image/png"
+            assert response.read() == b"png"
+        with urllib.request.urlopen(tile_url.format(z=13, x=3069, y=4589)) as response:
+            assert response.status == 204
+        with urllib.request.urlopen(tile_url.format(z=12, x=1, y=2)) as response:
+            assert response.status == 204
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(tile_url.replace(layer_id, "abc").format(z=3, x=1, y=2))
+    finally:
+        tile_server.stop()
+
+def test_tile_server_hides_render_errors(mocker, tile_params, caplog):
+    mocker.patch(
+        "model.read_stac.ReadSTAC.render_tile_from_stac",
+        side_effect=RuntimeError("s3://private-bucket/scene.tif"))
+    tile_server = TileServer(ImageRenderer(), port=0).start()
+    try:
+        layer_id = tile_server.register_layer(tile_params)
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(tile_server.get_tile_url(layer_id).format(z=12, x=1534, y=2294))
+        assert error.value.code == 500
+        assert b"private-bucket" not in error.value.read()
+    finally:
+        tile_server.stop()
+    assert "private-bucket" in caplog.text
+
+def test_tile_server_requires_public_url_off_loopback(caplog):
+    with pytest.raises(ValueError):
+        TileServer(ImageRenderer(), host="0.0.0.0", port=0).start()
+    tile_server = TileServer(
+        ImageRenderer(), host="0.0.0.0", port=0, public_url="https://tiles.example.com").start()
+    tile_server.stop()
+    assert "TILE_SERVER_URL" not in caplog.text
+    TileServer(ImageRenderer(), port=0).start().stop()
+    assert "TILE_SERVER_URL" in caplog.text
@@ -1,3 +1,5 @@
+import numpy as np
+from shapely.geometry import shape
 from model.buffer_point import BufferPoint
 
 def test_point_to_buffer():
@@ -8,3 +10,20 @@ def test_point_to_buffer():
     point_buffer = BufferPoint()
     buffer_geometry = point_buffer.buffer(latitude, longitude, buffer_distance)
     assert isinstance(buffer_geometry, dict)
+
+def test_buffer_many_matches_buffer():
+    latitudes = [20, -21.1, 45.5]
+    longitudes = [23, -45.1, 120.2]
+    point_buffer = BufferPoint()
+    buffer_geometries = point_buffer.buffer_many(latitudes, longitudes, 100)
+    assert len(buffer_geometries) == 3
+    for latitude, longitude, buffer_geometry in zip(latitudes, longitudes, buffer_geometries):
+        expected = point_buffer.buffer(latitude, longitude, 100)
+        assert buffer_geometry["type"] == expected["type"]
+        assert np.allclose(buffer_geometry["coordinates"][0], expected["coordinates"][0])
+
+def test_buffer_many_distances_and_empty():
+    point_buffer = BufferPoint()
+    buffer_geometries = point_buffer.buffer_many([20, 20], [23, 23], [100, 200])
+    assert shape(buffer_geometries[1]).area > shape(buffer_geometries[0]).area
+    assert point_buffer.buffer_many([], [], 100) == []
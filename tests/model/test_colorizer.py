@@ -0,0 +1,34 @@
+import numpy as np
+from rio_tiler.colormap import apply_cmap, cmap
+from model.colorizer import Colorizer
+
+
+def test_init_colorizer():
+    colorizer = Colorizer()
+    assert isinstance(colorizer, Colorizer)
+
+def test_colorizer_lookup_table_is_reused():
+    colorizer = Colorizer()
+    lookup_table = colorizer.get_lookup_table("terrain")
+    assert lookup_table.shape == (256, 4)
+    assert lookup_table.dtype == np.uint8
+    assert colorizer.get_lookup_table("terrain") is lookup_table
+
+def test_colorizer_gray_uses_mask_as_alpha():
+    colorizer = Colorizer()
+    hillshade = np.array([[0.5, 100.9], [200.2, 255.0]])
+    mask = np.array([[255, 0], [255, 255]], dtype=np.uint8)
+    result = colorizer.colorize(hillshade, mask, "gray")
+    assert result.shape == (2, 2, 4)
+    assert result[..., 0].tolist() == [[0, 100], [200, 255]]
+    assert result[..., 3].tolist() == mask.tolist()
+
+def test_colorizer_matches_apply_cmap():
+    colorizer = Colorizer()
+    data = np.arange(256, dtype=np.uint8).reshape(1, 16, 16)
+    mask = np.full((16, 16), 255, dtype=np.uint8)
+    mask[0] = 0
+    rgb, alpha = apply_cmap(data, cmap.get("viridis"))
+    expected = np.dstack((*rgb, np.bitwise_and(alpha, mask)))
+    result = colorizer.colorize(data[0], mask, "viridis", use_colormap_alpha=True)
+    assert np.array_equal(result, expected)
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from skimage import measure
+from model import contour_generator as contour_generator_module
+from model.contour_generator import ContourGenerator
+
+
+def test_init_contour_generator():
+    contour_generator = ContourGenerator()
+    assert isinstance(contour_generator, ContourGenerator)
+
+def test_get_contours_levels_and_coordinates():
+    contour_generator = ContourGenerator()
+    array = np.tile(np.arange(10, dtype=np.float32) * 10, (10, 1))
+    mask = np.full((10, 10), 255, dtype=np.uint8)
+    contours = contour_generator.get_contours(array, mask, (0, 0, 10, 10), (20,))[20]
+
+    assert contours["type"] == "FeatureCollection"
+    assert [feature["properties"]["pixel_value"] for feature in contours["features"]] == [
+        0, 20, 40, 60, 80]
+    line = contours["features"][1]["geometry"]
+    assert line["type"] == "LineString"
+    assert {x for x, _ in line["coordinates"]} == {2.5}
+
+def test_get_contours_multiple_intervals():
+    contour_generator = ContourGenerator()
+    array = np.tile(np.arange(10, dtype=np.float32) * 10, (10, 1))
+    contours = contour_generator.get_contours(array, None, (0, 0, 10, 10), (10, 30))
+
+    assert [feature["properties"]["pixel_value"] for feature in contours[10]["features"]] == [
+        0, 10, 20, 30, 40, 50, 60, 70, 80]
+    assert [feature["properties"]["pixel_value"] for feature in contours[30]["features"]] == [
+        0, 30, 60]
+    assert contours[30]["features"][1]["geometry"] == contours[10]["features"][3]["geometry"]
+
+def test_get_contours_ignores_masked_pixels():
+    contour_generator = ContourGenerator()
+    array = np.tile(np.arange(10, dtype=np.float32) * 10, (10, 1))
+    array[:, 5:] = -12000
+    mask = np.full((10, 10), 255, dtype=np.uint8)
+    mask[:, 5:] = 0
+    contours = contour_generator.get_contours(array, mask, (0, 0, 10, 10), (10,))[10]
+
+    assert max(feature["properties"]["pixel_value"] for feature in contours["features"]) == 30
+    assert all(
+        x < 5 for feature in contours["features"] for x, _ in feature["geometry"]["coordinates"])
+
+def test_get_contours_without_gdal_scans_only_crossed_cells(mocker):
+    contour_generator = ContourGenerator(use_gdal=False)
+    array = np.tile(np.arange(300, dtype=np.float32), (300, 1))
+    find_contours = mocker.spy(measure, "find_contours")
+    contours = contour_generator.get_contours(array, None, (0, 0, 300, 300), (1, 5))
+
+    assert len(contours[1]["features"]) == 299
+    assert len(contours[5]["features"]) == 60
+    assert find_contours.call_count == 300
+    scanned_cells = sum(call.args[0].size for call in find_contours.call_args_list)
+    # each level is traced on the columns it crosses, not the whole raster
+    assert scanned_cells <= 3 * array.size
+
+@pytest.mark.skipif(contour_generator_module.gdal is None, reason="GDAL bindings not installed")
+def test_get_contours_with_gdal_runs_one_sweep(mocker):
+    contour_generator = ContourGenerator()
+    array = np.tile(np.arange(300, dtype=np.float32), (300, 1))
+    contour_generate = mocker.spy(contour_generator_module.gdal, "ContourGenerateEx")
+    contours = contour_generator.get_contours(array, None, (0, 0, 300, 300), (1, 5))
+
+    assert contour_generate.call_count == 1
+    levels = {feature["properties"]["pixel_value"] for feature in contours[1]["features"]}
+    assert levels >= set(range(1, 299))
+    assert {feature["properties"]["pixel_value"] for feature in contours[5]["features"]} <= set(
+        range(0, 300, 5))
+    line = next(
+        feature for feature in contours[5]["features"]
+        if feature["properties"]["pixel_value"] == 20)
+    assert {x for x, _ in line["geometry"]["coordinates"]} == {20.5}
@@ -0,0 +1,96 @@
+import time
+import numpy as np
+import pytest
+import rasterio
+from affine import Affine
+from model.dataset_pool import DatasetPool, PooledReader
+
+@pytest.fixture
+def raster_path(tmp_path):
+    path = str(tmp_path / "raster.tif")
+    with rasterio.open(
+        path, "w", driver="GTiff", height=16, width=16, count=1, dtype="uint16",
+        crs="EPSG:4326", transform=Affine(0.001, 0, -45, 0, -0.001, -21)
+    ) as dst:
+        dst.write(np.arange(256, dtype=np.uint16).reshape(1, 16, 16))
+    return path
+
+def test_init_dataset_pool():
+    dataset_pool = DatasetPool()
+    assert isinstance(dataset_pool, DatasetPool)
+
+def test_dataset_pool_reuses_datasets(raster_path):
+    dataset_pool = DatasetPool()
+    with dataset_pool.checkout(raster_path) as first:
+        with dataset_pool.checkout(raster_path) as second:
+            assert first is not second
+    with dataset_pool.checkout(raster_path) as third:
+        assert third in (first, second)
+        assert not third.closed
+    assert dataset_pool.opened == 2
+    assert dataset_pool.reused == 1
+    assert len(dataset_pool) == 2
+
+def test_dataset_pool_separates_scopes(raster_path):
+    dataset_pool = DatasetPool()
+    with dataset_pool.checkout(raster_path, "a"):
+        pass
+    with dataset_pool.checkout(raster_path, "b"):
+        pass
+    assert dataset_pool.opened == 2
+    assert dataset_pool.reused == 0
+
+def test_dataset_pool_expires_idle_datasets(raster_path):
+    dataset_pool = DatasetPool(idle_seconds=0.05)
+    with dataset_pool.checkout(raster_path) as dataset:
+        pass
+    time.sleep(0.1)
+    with dataset_pool.checkout(raster_path):
+        pass
+    assert dataset.closed
+    assert dataset_pool.expired == 1
+    assert dataset_pool.reused == 0
+
+def test_dataset_pool_limits_idle_datasets(raster_path):
+    dataset_pool = DatasetPool(max_idle_datasets=1)
+    with dataset_pool.checkout(raster_path):
+        with dataset_pool.checkout(raster_path):
+            pass
+    assert len(dataset_pool) == 1
+    assert dataset_pool.expired == 1
+
+def test_dataset_pool_closes_dataset_on_error(raster_path):
+    dataset_pool = DatasetPool()
+    with pytest.raises(ValueError):
+        with dataset_pool.checkout(raster_path) as dataset:
+            raise ValueError("read failed")
+    assert dataset.closed
+    assert len(dataset_pool) == 0
+
+def test_pooled_reader(raster_path):
+    dataset_pool = DatasetPool()
+    for _ in range(3):
+        with PooledReader(raster_path, dataset_pool=dataset_pool) as reader:
+            image_data = reader.preview(max_size=16)
+    assert image_data.data.shape == (1, 16, 16)
+    assert dataset_pool.opened == 1
+    assert dataset_pool.reused == 2
+
+def test_pooled_reader_drops_dataset_on_failed_read(raster_path):
+    dataset_pool = DatasetPool()
+    with pytest.raises(ValueError):
+        with PooledReader(raster_path, dataset_pool=dataset_pool) as reader:
+            dataset = reader.dataset
+            raise ValueError("read failed")
+    assert dataset.closed
+    assert len(dataset_pool) == 0
+
+def test_pooled_reader_drops_dataset_on_failed_init(raster_path, mocker):
+    dataset_pool = DatasetPool()
+    open_dataset = mocker.spy(rasterio, "open")
+    mocker.patch("rio_tiler.io.Reader._get_colormap", side_effect=ValueError("bad colormap"))
+    with pytest.raises(ValueError):
+        PooledReader(raster_path, dataset_pool=dataset_pool)
+    assert dataset_pool.opened == 1
+    assert open_dataset.spy_return.closed
+    assert len(dataset_pool) == 0
@@ -0,0 +1,125 @@
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from model.disk_cache import DiskCache
+
+
+def test_init_disk_cache(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"), max_bytes=1000)
+    assert isinstance(cache, DiskCache)
+    assert os.path.isdir(tmp_path / "cache")
+
+def test_disk_cache_get_set(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10000)
+    assert cache.set("a", {"image": b"1234", "bounds": [[0, 0], [1, 1]]})
+    assert cache.get("a") == {"image": b"1234", "bounds": [[0, 0], [1, 1]]}
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_disk_cache_persists_between_instances(tmp_path):
+    DiskCache(str(tmp_path), max_bytes=10000).set("a", b"1234")
+    assert DiskCache(str(tmp_path), max_bytes=10000).get("a") == b"1234"
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=4000)
+    cache.set("a", b"0" * 1000)
+    cache.set("b", b"0" * 1000)
+    past = time.time() - 100
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (past, past))
+    cache.get("a")
+    cache.set("c", b"0" * 1000)
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+def test_disk_cache_expires_entries(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10000, ttl_seconds=60)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234", ttl_seconds=-1)
+    assert cache.get("a") == b"1234"
+    assert cache.get("b") is None
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_disk_cache_rejects_oversized_value(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    assert not cache.set("a", b"0" * 100)
+    assert cache.get("a") is None
+
+def test_disk_cache_round_trips_render_results(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=100000)
+    value = {
+        "image": np.arange(12, dtype=np.uint8).reshape(3, 2, 2),
+        "zip_file": b"PK",
+        "bounds": [[0.5, 1.5], [2.5, 3.5]],
+        "contours": {10: {"type": "FeatureCollection", "features": []}},
+        "location": (45.5, -73.5),
+        "min_value": np.float32(1.5),
+        "name": "item"
+    }
+    cache.set("a", value)
+    cached = cache.get("a")
+    np.testing.assert_array_equal(cached.pop("image"), value.pop("image"))
+    assert cached == value
+    assert isinstance(cached["location"], tuple)
+
+def test_disk_cache_does_not_unpickle_entries(tmp_path, mocker):
+    cache = DiskCache(str(tmp_path), max_bytes=10000)
+    cache.set("a", b"1234")
+    loads = mocker.spy(pickle, "loads")
+    for name in os.listdir(tmp_path):
+        with open(tmp_path / name, "wb") as entry:
+            entry.write(pickle.dumps({"image": b"1234"}))
+    assert cache.get("a") is None
+    assert loads.call_count == 0
+    assert not os.listdir(tmp_path)
+
+def test_disk_cache_rejects_object_arrays(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10000)
+    assert not cache.set("a", np.array([object()]))
+    assert not os.listdir(tmp_path)
+
+def test_disk_cache_tracks_size_without_rescanning(tmp_path, mocker):
+    cache = DiskCache(str(tmp_path), max_bytes=10000)
+    scandir = mocker.spy(os, "scandir")
+    cache.set("a", b"0" * 1000)
+    cache.set("b", b"0" * 1000)
+    cache.set("a", b"0" * 100)
+    assert scandir.call_count == 0
+    sizes = [os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)]
+    assert cache.total_bytes == sum(sizes)
+    cache.get("missing")
+    cache.clear()
+    assert cache.total_bytes == 0
+
+def test_disk_cache_counts_hits_and_misses_across_threads(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10000)
+    cache.set("a", b"0")
+    keys = ["a", "missing"] * 200
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(cache.get, keys))
+    assert cache.hits == 200
+    assert cache.misses == 200
+
+def test_disk_cache_removes_stale_temp_files(tmp_path):
+    stale_path = tmp_path / "stale.tmp"
+    stale_path.write_bytes(b"0" * 1000)
+    old_time = time.time() - 7200
+    os.utime(stale_path, (old_time, old_time))
+    (tmp_path / "fresh.tmp").write_bytes(b"0" * 1000)
+
+    cache = DiskCache(str(tmp_path), max_bytes=2000)
+    assert sorted(os.listdir(tmp_path)) == ["fresh.tmp"]
+
+    stale_path.write_bytes(b"0" * 1000)
+    os.utime(stale_path, (old_time, old_time))
+    cache.set("a", b"0" * 1000)
+    cache.set("b", b"0" * 1000)
+    assert "stale.tmp" not in os.listdir(tmp_path)
+    assert "fresh.tmp" in os.listdir(tmp_path)
@@ -0,0 +1,51 @@
+import numpy as np
+from model.memory_cache import MemoryCache
+
+
+def test_init_memory_cache():
+    cache = MemoryCache(max_bytes=100)
+    assert isinstance(cache, MemoryCache)
+
+def test_memory_cache_get_set():
+    cache = MemoryCache(max_bytes=100)
+    cache.set("a", b"1234")
+    assert cache.get("a") == b"1234"
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.current_bytes == 4
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_bytes=100)
+    cache.set("a", np.zeros(40, dtype=np.uint8))
+    cache.set("b", np.zeros(40, dtype=np.uint8))
+    cache.get("a")
+    cache.set("c", np.zeros(40, dtype=np.uint8))
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.current_bytes == 80
+
+def test_memory_cache_rejects_oversized_value():
+    cache = MemoryCache(max_bytes=10)
+    assert cache.set("a", b"0" * 11) is False
+    assert len(cache) == 0
+
+def test_memory_cache_custom_size():
+    cache = MemoryCache(max_bytes=10, size_of=lambda value: 6)
+    cache.set("a", "x")
+    cache.set("b", "y")
+    assert len(cache) == 1
+    cache.clear()
+    assert cache.current_bytes == 0
+
+def test_memory_cache_expires_entries(mocker):
+    monotonic = mocker.patch("model.memory_cache.time.monotonic", return_value=100.0)
+    cache = MemoryCache(max_bytes=100)
+    cache.set("a", b"1234", ttl_seconds=10)
+    cache.set("b", b"1234")
+    assert cache.get("a") == b"1234"
+    monotonic.return_value = 111.0
+    assert cache.get("a") is None
+    assert cache.get("b") == b"1234"
+    assert cache.current_bytes == 4
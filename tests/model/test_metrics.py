@@ -0,0 +1,94 @@
+import numpy as np
+import rasterio
+from affine import Affine
+from model.dataset_pool import DatasetPool
+from model.metrics import Metrics, metrics
+
+
+def test_init_metrics():
+    metrics = Metrics()
+    assert isinstance(metrics, Metrics)
+
+def test_metrics_counters_and_summaries():
+    metrics = Metrics()
+    metrics.increment("render_requests_total")
+    metrics.increment("render_requests_total", 2)
+    metrics.observe("geocode_seconds", 0.5)
+    metrics.observe("geocode_seconds", 1.5)
+    with metrics.timer("geocode_seconds"):
+        pass
+    assert metrics.get_counter("render_requests_total") == 3
+    assert metrics.get_summary("geocode_seconds")[0] == 3
+    assert metrics.get_summary("geocode_seconds")[1] >= 2
+
+def test_metrics_stage_timings():
+    metrics = Metrics()
+    timings = metrics.stage_timings("render")
+    with timings.stage("read"):
+        pass
+    with timings.stage("read"):
+        pass
+    timings.add_bytes("zip", "out", 100)
+    assert list(timings.timings) == ["read"]
+    assert metrics.get_summary("render_stage_seconds", stage="read")[0] == 2
+    assert metrics.get_counter("render_bytes_out_total", stage="zip") == 100
+
+def test_metrics_prometheus_format():
+    metrics = Metrics()
+    metrics.increment("stac_search_items_total", 4, collection="sentinel-2-l2a")
+    metrics.observe("render_stage_seconds", 0.25, stage="read")
+    assert metrics.to_prometheus() == (
+        "# TYPE stac_search_items_total counter\n"
+        'stac_search_items_total{collection="sentinel-2-l2a"} 4\n'
+        "# TYPE render_stage_seconds summary\n"
+        'render_stage_seconds_sum{stage="read"} 0.25\n'
+        'render_stage_seconds_count{stage="read"} 1\n'
+    )
+
+def test_metrics_prometheus_mixed_label_values():
+    metrics = Metrics()
+    metrics.increment("stac_search_items_total", collection=None)
+    metrics.increment("stac_search_items_total", 2, collection="sentinel-2-l2a")
+    metrics.observe("stac_search_seconds", 0.5, collection=None)
+    metrics.observe("stac_search_seconds", 0.5, collection="sentinel-2-l2a")
+    assert metrics.get_counter("stac_search_items_total", collection=None) == 1
+    assert metrics.to_prometheus() == (
+        "# TYPE stac_search_items_total counter\n"
+        'stac_search_items_total{collection=""} 1\n'
+        'stac_search_items_total{collection="sentinel-2-l2a"} 2\n'
+        "# TYPE stac_search_seconds summary\n"
+        'stac_search_seconds_sum{collection=""} 0.5\n'
+        'stac_search_seconds_count{collection=""} 1\n'
+        'stac_search_seconds_sum{collection="sentinel-2-l2a"} 0.5\n'
+        'stac_search_seconds_count{collection="sentinel-2-l2a"} 1\n'
+    )
+
+def test_metrics_dataset_pool_counters(tmp_path):
+    path = str(tmp_path / "raster.tif")
+    with rasterio.open(
+        path, "w", driver="GTiff", height=4, width=4, count=1, dtype="uint8",
+        crs="EPSG:4326", transform=Affine(0.001, 0, -45, 0, -0.001, -21)
+    ) as dst:
+        dst.write(np.zeros((1, 4, 4), dtype=np.uint8))
+    counts_before = {
+        result: metrics.get_counter("dataset_pool_total", result=result)
+        for result in ("opened", "reused", "expired")
+    }
+    dataset_pool = DatasetPool(idle_seconds=-1)
+    with dataset_pool.checkout(path):
+        pass
+    with dataset_pool.checkout(path):
+        pass
+    dataset_pool = DatasetPool()
+    with dataset_pool.checkout(path):
+        pass
+    with dataset_pool.checkout(path):
+        pass
+
+    assert metrics.get_counter("dataset_pool_total", result="opened") == counts_before["opened"] + 3
+    assert metrics.get_counter("dataset_pool_total", result="reused") == counts_before["reused"] + 1
+    assert metrics.get_counter("dataset_pool_total", result="expired") == counts_before["expired"] + 2
+    prometheus = metrics.to_prometheus()
+    assert "# TYPE dataset_pool_total counter" in prometheus
+    for result in ("opened", "reused", "expired"):
+        assert f'dataset_pool_total{{result="{result}"}}' in prometheus
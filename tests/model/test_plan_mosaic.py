@@ -0,0 +1,57 @@
+import pytest
+from model.plan_mosaic import PlanMosaic
+
+
+def square(xmin, ymin, xmax, ymax):
+    return {
+        "type": "Polygon",
+        "coordinates": [[[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax], [xmin, ymin]]]
+    }
+
+def stac_item(item_id, geometry):
+    return {"id": item_id, "geometry": geometry}
+
+@pytest.fixture
+def area_of_interest():
+    return square(0, 0, 10, 10)
+
+def test_init_plan_mosaic():
+    plan_mosaic = PlanMosaic()
+    assert isinstance(plan_mosaic, PlanMosaic)
+
+def test_plan_stops_when_covered(area_of_interest):
+    items = [
+        stac_item("full", square(-1, -1, 11, 11)),
+        stac_item("other", square(0, 0, 10, 10)),
+    ]
+    plan = PlanMosaic().plan(items, area_of_interest)
+    assert [item["id"] for item in plan["items"]] == ["full"]
+    assert plan["coverage"] == pytest.approx(1)
+    assert plan["skipped_items"] == 1
+
+def test_plan_keeps_order_and_skips_small_contributions(area_of_interest):
+    items = [
+        stac_item("left", square(-5, -5, 5, 15)),
+        stac_item("sliver", square(9.99, 0, 20, 0.5)),
+        stac_item("outside", square(20, 20, 30, 30)),
+        stac_item("right", square(4, -5, 15, 15)),
+    ]
+    plan = PlanMosaic(min_contribution=0.01).plan(items, area_of_interest)
+    assert [item["id"] for item in plan["items"]] == ["left", "right"]
+    assert plan["contributions"] == [pytest.approx(0.5), pytest.approx(0.5)]
+    assert plan["coverage"] == pytest.approx(1)
+
+def test_plan_reports_partial_coverage(area_of_interest):
+    items = [stac_item("quarter", square(5, 5, 15, 15))]
+    plan = PlanMosaic().plan(items, area_of_interest)
+    assert plan["coverage"] == pytest.approx(0.25)
+
+def test_plan_keeps_items_without_footprint(area_of_interest):
+    items = [{"id": "unknown"}, stac_item("outside", square(20, 20, 30, 30))]
+    plan = PlanMosaic().plan(items, area_of_interest)
+    assert [item["id"] for item in plan["items"]] == ["unknown"]
+
+def test_plan_falls_back_to_first_item(area_of_interest):
+    items = [stac_item("outside", square(20, 20, 30, 30))]
+    plan = PlanMosaic().plan(items, area_of_interest)
+    assert plan["items"] == items
@@ -3,7 +3,13 @@ from PIL import Image
 import pytest
 import json
 import numpy as np
+from model.metrics import Metrics
 from model.read_stac import ReadSTAC
+from model.dataset_pool import PooledReader
+from rio_tiler.models import ImageData
+import rasterio
+from rasterio.crs import CRS
+from rasterio.session import AWSSession
 import zipfile
 import os
 
@@ -81,6 +87,14 @@ def sample_image_zip():
         zip_file.writestr("image.png", image_bytes_io.getvalue())
         return zip_buffer.getvalue()
 
+@pytest.fixture
+def mosaic_image_data():
+    data = np.ma.MaskedArray(
+        np.arange(3 * 20 * 20, dtype=np.uint16).reshape((3, 20, 20)),
+        mask=np.zeros((3, 20, 20), dtype=bool)
+    )
+    return ImageData(data, crs=CRS.from_epsg(4326), bounds=(-46.7, -23.6, -46.6, -23.5))
+
 def test_init_read_stac():
     stac_reader = ReadSTAC()
     assert isinstance(stac_reader, ReadSTAC)
@@ -398,3 +412,220 @@ def test_render_mosaic_image_expression_contour(
     assert isinstance(image_data["image"], type(sample_image_array))
     assert isinstance(image_data["bounds"], list)
     assert isinstance(image_data["contours"], type(feature_contour_geojson))
+
+
+def test_render_mosaic_reuses_cached_image_data(mocker, stac_item, feature_geojson, mosaic_image_data):
+    mocked_reader = mocker.patch(
+        "model.read_stac.mosaic_reader",
+        return_value=(mosaic_image_data, [stac_item])
+    )
+    stac_reader = ReadSTAC()
+    stac_reader.metrics = Metrics()
+    params = {
+            "feature_geojson": feature_geojson,
+            "stac_list": [stac_item],
+            "image_format": "PNG",
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000,
+            "max_size": 52
+    }
+    stac_reader.render_mosaic_from_stac(dict(params))
+    params.update({"min_value": 100, "color_formula": "gamma RGB 1.5"})
+    image_data = stac_reader.render_mosaic_from_stac(dict(params))
+    params.update({"assets": ("nir", "red", "green")})
+    stac_reader.render_mosaic_from_stac(dict(params))
+
+    assert mocked_reader.call_count == 2
+    assert stac_reader.image_data_cache.hits == 1
+    assert stac_reader.metrics.get_counter("render_image_data_cache_hits_total") == 1
+    assert stac_reader.metrics.get_counter(
+        "render_bytes_in_total", stage="read") == 2 * mosaic_image_data.array.data.nbytes
+    assert isinstance(image_data["image"], bytes)
+
+def test_render_mosaic_array_and_zip_from_single_encode(
+        mocker, stac_item, feature_geojson, mosaic_image_data):
+    mocker.patch(
+        "model.read_stac.mosaic_reader",
+        return_value=(mosaic_image_data, [stac_item])
+    )
+    stac_reader = ReadSTAC()
+    params = {
+            "feature_geojson": feature_geojson,
+            "stac_list": [stac_item],
+            "image_format": "PNG",
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000,
+            "image_as_array": True,
+            "zip_file": True
+    }
+    image_data = stac_reader.render_mosaic_from_stac(params)
+    with zipfile.ZipFile(io.BytesIO(image_data["zip_file"])) as zip_file:
+        zipped_image = np.asarray(Image.open(io.BytesIO(zip_file.read("image.png"))))
+
+    assert image_data["image"].shape == (20, 20, 4)
+    assert np.array_equal(zipped_image, image_data["image"])
+
+def test_render_mosaic_scopes_session_to_reader(
+        mocker, stac_item, feature_geojson, mosaic_image_data):
+    reader = mocker.patch("model.read_stac.STACReader")
+    reader.return_value.__enter__.return_value.feature.return_value = mosaic_image_data
+    session = AWSSession(aws_unsigned=True, region_name="eu-central-1")
+    stac_reader = ReadSTAC()
+    params = {
+            "feature_geojson": feature_geojson,
+            "stac_list": [stac_item],
+            "image_format": "PNG",
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000,
+    }
+    stac_reader.render_mosaic_from_stac(params, session=session)
+    ctx = reader.call_args.kwargs["ctx"]
+    with ctx():
+        assert rasterio.env.getenv()["AWS_NO_SIGN_REQUEST"] == "YES"
+    assert os.environ.get("AWS_NO_SIGN_REQUEST") is None
+    reader_options = reader.call_args.kwargs["reader_options"]
+    assert reader.call_args.kwargs["reader"] is PooledReader
+    assert reader_options["dataset_pool"] is stac_reader.dataset_pool
+    assert json.loads(reader_options["pool_scope"]) == session.get_credential_options()
+
+def test_render_mosaic_reports_read_timings(mocker, stac_item, feature_geojson, mosaic_image_data):
+    reader = mocker.patch("model.read_stac.STACReader")
+    reader.return_value.__enter__.return_value.feature.return_value = mosaic_image_data
+    stac_reader = ReadSTAC(item_threads=2, asset_threads=4, max_concurrent_reads=8)
+    params = {
+            "feature_geojson": feature_geojson,
+            "stac_list": [stac_item],
+            "image_format": "PNG",
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000,
+    }
+    image_data = stac_reader.render_mosaic_from_stac(dict(params))
+    feature = reader.return_value.__enter__.return_value.feature
+    assert feature.call_args.kwargs["threads"] == 4
+    assert list(image_data["read_timings"].keys()) == [stac_item["id"]]
+
+    image_data = stac_reader.render_mosaic_from_stac(dict(params))
+    assert image_data["read_timings"] == {}
+
+def test_render_mosaic_contours_without_subprocess(mocker, stac_item, feature_geojson):
+    dem = np.tile(np.arange(20, dtype=np.float32) * 10, (20, 1))[np.newaxis]
+    dem_image_data = ImageData(
+        np.ma.MaskedArray(dem, mask=np.zeros(dem.shape, dtype=bool)),
+        bounds=(0, 0, 20, 20),
+        crs=CRS.from_epsg(4326)
+    )
+    mocker.patch(
+        "model.read_stac.mosaic_reader",
+        return_value=(dem_image_data, [stac_item])
+    )
+    stac_reader = ReadSTAC()
+    params = {
+            "feature_geojson": feature_geojson,
+            "stac_list": [stac_item],
+            "image_format": "PNG",
+            "expression": "dem",
+            "compute_min_max": True,
+            "create_contour": True,
+            "gap": [50, 100],
+            "zip_file": True
+    }
+    image_data = stac_reader.render_mosaic_from_stac(params)
+    with zipfile.ZipFile(io.BytesIO(image_data["zip_file"])) as zip_file:
+        contours_50 = json.loads(zip_file.read("contours_50.geojson"))
+
+    assert len(image_data["contours"][100]["features"]) == 2
+    assert contours_50 == image_data["contours"][50]
+    assert len(contours_50["features"]) == 4
+
+def test_render_tile_from_stac(mocker, stac_item, mosaic_image_data):
+    reader = mocker.patch("model.read_stac.STACReader")
+    reader.return_value.__enter__.return_value.tile.return_value = mosaic_image_data
+    stac_reader = ReadSTAC()
+    params = {
+            "stac_list": [stac_item],
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000
+    }
+    tile = stac_reader.render_tile_from_stac(params, 1, 2, 3)
+    tile_reader = reader.return_value.__enter__.return_value.tile
+
+    assert tile_reader.call_args.args == (1, 2, 3)
+    assert tile_reader.call_args.kwargs["assets"] == ("red", "green", "blue")
+    assert Image.open(io.BytesIO(tile)).size == (20, 20)
+
+def test_render_tile_from_stac_clips_to_feature(mocker, stac_item, mosaic_image_data):
+    reader = mocker.patch("model.read_stac.STACReader")
+    reader.return_value.__enter__.return_value.tile.return_value = mosaic_image_data
+    stac_reader = ReadSTAC()
+    # west half of tile 1534/2294 at zoom 12
+    west, south, east, north = -45.2, -21.3, -45.1318359375, -21.0
+    params = {
+            "feature_geojson": {
+                "type": "Feature",
+                "properties": {},
+                "geometry": {"type": "Polygon", "coordinates": [[
+                    [west, south], [east, south], [east, north], [west, north], [west, south]]]}
+            },
+            "stac_list": [stac_item],
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000
+    }
+    tile = stac_reader.render_tile_from_stac(params, 1534, 2294, 12)
+    alpha = np.asarray(Image.open(io.BytesIO(tile)))[..., 3]
+
+    assert (alpha[:, :9] == 255).all()
+    assert (alpha[:, 11:] == 0).all()
+
+def test_render_mosaic_reports_stage_timings(mocker, stac_item, feature_geojson, mosaic_image_data):
+    mocker.patch(
+        "model.read_stac.mosaic_reader",
+        return_value=(mosaic_image_data, [stac_item])
+    )
+    stac_reader = ReadSTAC()
+    requests_before = stac_reader.metrics.get_counter("render_requests_total")
+    params = {
+            "feature_geojson": feature_geojson,
+            "stac_list": [stac_item],
+            "image_format": "PNG",
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000,
+            "zip_file": True
+    }
+    image_data = stac_reader.render_mosaic_from_stac(params)
+
+    assert list(image_data["stage_timings"]) == [
+        "read", "post_process", "render", "world_file", "encode", "zip"]
+    assert stac_reader.metrics.get_counter("render_requests_total") == requests_before + 1
+    assert 'render_stage_seconds_count{stage="zip"}' in stac_reader.metrics.to_prometheus()
+
+def test_render_mosaic_zips_full_resolution_preview(
+        mocker, stac_item, feature_geojson, mosaic_image_data):
+    mocker.patch(
+        "model.read_stac.mosaic_reader",
+        return_value=(mosaic_image_data, [stac_item])
+    )
+    stac_reader = ReadSTAC()
+    params = {
+            "feature_geojson": feature_geojson,
+            "stac_list": [stac_item],
+            "image_format": "PNG",
+            "assets":("red", "green", "blue"),
+            "min_value": 0,
+            "max_value": 4000,
+            "max_size": 52
+    }
+    image_data = stac_reader.render_mosaic_from_stac(dict(params))
+    zip_content = stac_reader.create_zip_from_render(image_data, params)
+    with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
+        assert zip_file.read("image.png") == image_data["image"]
+        assert zip_file.read("image.pgw").decode() == image_data["projection_file"]
+
+    assert image_data["full_resolution"]
+    assert not stac_reader.render_mosaic_from_stac(dict(params, max_size=20))["full_resolution"]
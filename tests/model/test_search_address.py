@@ -1,3 +1,4 @@
+import pytest
 from model.search_address import SearchAddress
 
 
@@ -25,4 +26,18 @@ def test_search_address_null():
         api_url="https://nominatim.openstreetmap.org/search.bad", api_key="abcd")
     result = search_address.search_address(test_address)
     assert isinstance(result, tuple)
-    assert result == (0,0)
\ No newline at end of file
+    assert result == (0,0)
+
+def test_search_address_rate_limit(requests_mock, mocker):
+    requests_mock.get("https://nominatim.openstreetmap.org/search", json=[{"lat": 1, "lon": 1}])
+    mocker.patch("model.search_address.time.monotonic", side_effect=[100.0, 100.0, 100.02, 100.5])
+    sleep = mocker.patch("model.search_address.time.sleep")
+    search_address = SearchAddress(
+        api_url="https://nominatim.openstreetmap.org/search",
+        api_key="abcd",
+        max_requests_per_second=10
+    )
+    for address in ("a", "b", "c", "d"):
+        search_address.search_address(address)
+    sleep_seconds = [call.args[0] for call in sleep.call_args_list]
+    assert sleep_seconds == pytest.approx([0.1, 0.18])
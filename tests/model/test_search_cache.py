@@ -0,0 +1,108 @@
+import os
+
+from model.search_cache import SearchCache
+
+
+def get_polygon(min_x, min_y, max_x, max_y):
+    return {
+        "type": "Polygon",
+        "coordinates": [[
+            [min_x, min_y], [max_x, min_y], [max_x, max_y], [min_x, max_y], [min_x, min_y]
+        ]]
+    }
+
+def get_item(item_id, date, min_x=0, min_y=0, max_x=1, max_y=1):
+    return {
+        "id": item_id,
+        "bbox": [min_x, min_y, max_x, max_y],
+        "geometry": get_polygon(min_x, min_y, max_x, max_y),
+        "properties": {"datetime": f"{date}T10:00:00.123Z"},
+    }
+
+def test_init_search_cache(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache" / "search.sqlite"))
+    assert isinstance(cache, SearchCache)
+    assert (tmp_path / "cache" / "search.sqlite").exists()
+
+def test_search_cache_answers_covered_search(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite"))
+    items = [
+        get_item("a", "2020-03-01"),
+        get_item("b", "2020-02-01", 2, 2, 3, 3),
+        get_item("c", "2020-01-01"),
+    ]
+    assert cache.set("s2", get_polygon(0, 0, 4, 4), "2020-01-01/2020-12-31", items)
+
+    results = cache.get("s2", get_polygon(0.4, 0.4, 0.6, 0.6), "2020-01-01/2020-02-28")
+    assert [item["id"] for item in results] == ["c"]
+    results = cache.get("s2", get_polygon(0.4, 0.4, 2.5, 2.5), "2020-01-01/2020-12-31")
+    assert [item["id"] for item in results] == ["a", "b", "c"]
+    assert cache.hits == 2
+
+def test_search_cache_misses_uncovered_search(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite"))
+    cache.set("s2", get_polygon(0, 0, 1, 1), "2020-01-01/2020-12-31", [get_item("a", "2020-03-01")])
+    assert cache.get("s2", get_polygon(0.5, 0.5, 1.5, 1.5), "2020-01-01/2020-12-31") is None
+    assert cache.get("s2", get_polygon(0, 0, 1, 1), "2019-01-01/2020-12-31") is None
+    assert cache.get("landsat", get_polygon(0, 0, 1, 1), "2020-01-01/2020-12-31") is None
+    assert cache.misses == 3
+
+def test_search_cache_truncated_search_cutoff(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite"))
+    items = [
+        get_item("a", "2020-05-01", 2, 2, 3, 3),
+        get_item("b", "2020-04-01"),
+        get_item("c", "2020-03-01", 2, 2, 3, 3),
+    ]
+    cache.set("s2", get_polygon(0, 0, 4, 4), "2020-01-01/2020-12-31", items, truncated=True)
+
+    results = cache.get("s2", get_polygon(2.2, 2.2, 2.8, 2.8), "2020-01-01/2020-12-31", max_items=1)
+    assert [item["id"] for item in results] == ["a"]
+    # older items than the cutoff may exist outside of the cache
+    assert cache.get("s2", get_polygon(0.2, 0.2, 0.8, 0.8), "2020-01-01/2020-12-31", max_items=2) is None
+    assert cache.get("s2", get_polygon(2.2, 2.2, 2.8, 2.8), "2020-01-01/2020-12-31", max_items=2) is None
+    results = cache.get("s2", get_polygon(0.2, 0.2, 0.8, 0.8), "2020-03-15/2020-12-31", max_items=2)
+    assert [item["id"] for item in results] == ["b"]
+
+def test_search_cache_shared_between_instances(tmp_path):
+    SearchCache(str(tmp_path / "search.sqlite")).set(
+        "s2", get_polygon(0, 0, 1, 1), "2020-01-01/2020-12-31", [get_item("a", "2020-03-01")])
+    results = SearchCache(str(tmp_path / "search.sqlite")).get(
+        "s2", get_polygon(0, 0, 1, 1), "2020-01-01/2020-12-31")
+    assert [item["id"] for item in results] == ["a"]
+
+def test_search_cache_open_ended_window_expires(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite"), open_ended_ttl_seconds=-1)
+    cache.set("s2", get_polygon(0, 0, 1, 1), "2020-01-01/..", [get_item("a", "2020-03-01")])
+    cache.set("s2", get_polygon(0, 0, 1, 1), "2020-01-01/2020-12-31", [get_item("a", "2020-03-01")])
+    assert cache.get("s2", get_polygon(0, 0, 1, 1), "2020-01-01/..") is None
+    assert cache.get("s2", get_polygon(0, 0, 1, 1), "2020-01-01/2020-12-31") is not None
+
+def test_search_cache_clear(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite"))
+    cache.set("s2", get_polygon(0, 0, 1, 1), "2020-01-01/2020-12-31", [get_item("a", "2020-03-01")])
+    cache.clear()
+    assert cache.get("s2", get_polygon(0, 0, 1, 1), "2020-01-01/2020-12-31") is None
+
+def test_search_cache_checks_searched_polygon(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite"))
+    triangle = {"type": "Polygon", "coordinates": [[[0, 0], [4, 0], [0, 4], [0, 0]]]}
+    cache.set("s2", triangle, "2020-01-01/2020-12-31", [])
+    # inside the triangle's bbox but outside the triangle itself
+    assert cache.get("s2", get_polygon(3, 3, 3.5, 3.5), "2020-01-01/2020-12-31") is None
+    assert cache.get("s2", get_polygon(0.5, 0.5, 1, 1), "2020-01-01/2020-12-31") == []
+
+def test_search_cache_uses_delete_journal_on_network_filesystem(tmp_path, mocker):
+    mounts = tmp_path / "mounts"
+    mounts.write_text(
+        "overlay / overlay rw 0 0\n"
+        f"server:/export {os.path.realpath(tmp_path / 'shared')} nfs4 rw 0 0\n"
+    )
+    assert SearchCache.is_network_filesystem(str(tmp_path / "shared" / "cache"), str(mounts))
+    assert not SearchCache.is_network_filesystem(str(tmp_path / "local"), str(mounts))
+
+    mocker.patch.object(SearchCache, "is_network_filesystem", return_value=True)
+    cache = SearchCache(str(tmp_path / "search.sqlite"))
+    assert cache.journal_mode == "DELETE"
+    cache.set("s2", get_polygon(0, 0, 1, 1), "2020-01-01/2020-12-31", [get_item("a", "2020-03-01")])
+    assert not (tmp_path / "search.sqlite-wal").exists()
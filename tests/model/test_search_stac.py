@@ -1,4 +1,5 @@
 import pytest
+import requests
 import json
 from model.search_stac import SearchSTAC
 from app_config import AppConfig
@@ -30,3 +31,108 @@ def test_search_stac(stac_url, feature_geojson, datestring):
     kwargs = {"datetime":datestring, "max_items":3, "intersects": feature_geojson}
     results = stac_client.get_items(**kwargs)
     assert isinstance(results, list)
+
+def get_stac_item(item_id, instrument_mode="IW"):
+    return {
+        "type": "Feature",
+        "id": item_id,
+        "bbox": [0, 0, 1, 1],
+        "links": [{"rel": "self", "href": f"https://example.com/{item_id}"}],
+        "properties": {"datetime": "2024-01-01T00:00:00Z", "sar:instrument_mode": instrument_mode},
+        "assets": {"vv": {"href": "vv.tif"}, "vh": {"href": "vh.tif"}, "thumbnail": {"href": "t.png"}},
+    }
+
+def test_search_stac_streams_until_enough_filtered_items(mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client")
+    consumed = []
+
+    def items_as_dicts():
+        for index in range(100):
+            consumed.append(index)
+            yield get_stac_item(str(index), "IW" if index % 2 else "EW")
+
+    stac_client = SearchSTAC("https://example.com")
+    stac_client.client.search.return_value.items_as_dicts = items_as_dicts
+    results = stac_client.get_items(
+        item_filter=lambda item: item["properties"]["sar:instrument_mode"] == "IW",
+        max_items=2,
+        collections=["sentinel-1-grd"]
+    )
+    assert [item["id"] for item in results] == ["1", "3"]
+    assert len(consumed) == 4
+    assert "max_items" not in stac_client.client.search.call_args.kwargs
+
+def test_search_stac_max_scanned_items(mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client")
+    stac_client = SearchSTAC("https://example.com")
+    stac_client.client.search.return_value.items_as_dicts.return_value = iter(
+        [get_stac_item(str(index), "EW") for index in range(100)])
+    results = stac_client.get_items(
+        item_filter=lambda item: item["properties"]["sar:instrument_mode"] == "IW",
+        max_items=2,
+        max_scanned_items=20
+    )
+    assert results == []
+    assert next(stac_client.client.search.return_value.items_as_dicts.return_value)["id"] == "20"
+
+def test_search_stac_prunes_items_to_fields(mocker):
+    mocker.patch("model.search_stac.SearchSTAC.connect_client")
+    stac_client = SearchSTAC("https://example.com")
+    stac_client.client.search.return_value.items_as_dicts.return_value = iter([get_stac_item("a")])
+    fields = {"include": ["type", "id", "bbox", "properties.datetime", "assets.vv"], "exclude": []}
+    results = stac_client.get_items(fields=fields)
+    assert results == [{
+        "type": "Feature",
+        "id": "a",
+        "bbox": [0, 0, 1, 1],
+        "properties": {"datetime": "2024-01-01T00:00:00Z"},
+        "assets": {"vv": {"href": "vv.tif"}},
+    }]
+    assert stac_client.client.search.call_args.kwargs["fields"] == fields
+
+def test_search_stac_connects_lazily(mocker):
+    connect_client = mocker.patch("model.search_stac.SearchSTAC.connect_client")
+    stac_client = SearchSTAC("https://example.com", timeout_seconds=3)
+    assert connect_client.call_count == 0
+    stac_client.client.search.return_value.items_as_dicts.return_value = iter([])
+    stac_client.get_items(collections=["sentinel-2-l2a"])
+    assert connect_client.call_count == 1
+    url, stac_io, timeout = connect_client.call_args.args
+    assert url == "https://example.com"
+    assert timeout == 3
+    assert stac_io.timeout == 3
+    assert stac_io.session.get_adapter("https://example.com").max_retries.total == 3
+
+def test_search_stac_reopens_client_on_failure(mocker):
+    failed_client = mocker.MagicMock()
+    failed_client.search.side_effect = requests.ConnectionError()
+    client = mocker.MagicMock()
+    client.search.return_value.items_as_dicts.return_value = iter([get_stac_item("a")])
+    connect_client = mocker.patch(
+        "model.search_stac.SearchSTAC.connect_client", side_effect=[failed_client, client])
+    stac_client = SearchSTAC("https://example.com")
+    results = stac_client.get_items(collections=["sentinel-1-grd"])
+    assert [item["id"] for item in results] == ["a"]
+    assert connect_client.call_count == 2
+    assert stac_client.client is client
+
+def test_search_stac_retries_connect_after_failure(mocker):
+    client = mocker.MagicMock()
+    client.search.return_value.items_as_dicts.return_value = iter([])
+    mocker.patch(
+        "model.search_stac.SearchSTAC.connect_client",
+        side_effect=[requests.ConnectionError(), requests.ConnectionError(), client])
+    stac_client = SearchSTAC("https://example.com")
+    with pytest.raises(requests.ConnectionError):
+        stac_client.get_items()
+    assert stac_client.get_items() == []
+
+def test_search_stac_checks_conformance_once(mocker):
+    client = mocker.Mock()
+    client.conforms_to.side_effect = lambda conformance_class: conformance_class == "QUERY"
+    mocker.patch("model.search_stac.SearchSTAC.connect_client", return_value=client)
+    stac_client = SearchSTAC("https://example.com")
+    assert stac_client.conforms_to("QUERY")
+    assert not stac_client.conforms_to("FILTER")
+    assert stac_client.conforms_to("QUERY")
+    assert client.conforms_to.call_count == 2
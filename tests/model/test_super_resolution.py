@@ -0,0 +1,45 @@
+import numpy as np
+from model.super_resolution import SuperResolution
+
+
+class FakeRDN:
+    instances = 0
+
+    def __init__(self, weights):
+        FakeRDN.instances += 1
+        self.weights = weights
+
+    def predict(self, image, by_patch_of_size):
+        return np.repeat(np.repeat(image, 2, axis=0), 2, axis=1)
+
+
+def test_super_resolution_is_lazy(mocker):
+    import_module = mocker.patch("model.super_resolution.import_module")
+    super_resolution = SuperResolution()
+    assert super_resolution.model is None
+    import_module.assert_not_called()
+
+def test_super_resolution_loads_once(mocker):
+    FakeRDN.instances = 0
+    mocker.patch("model.super_resolution.import_module").return_value.RDN = FakeRDN
+    super_resolution = SuperResolution()
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    result = super_resolution.predict(image)
+    super_resolution.predict(image)
+
+    assert result.shape == (8, 8, 3)
+    assert FakeRDN.instances == 1
+    assert super_resolution.model.weights == "psnr-small"
+    assert super_resolution.load_seconds >= 0
+    assert super_resolution.max_rss_bytes_after_load >= super_resolution.max_rss_bytes_before_load
+
+def test_super_resolution_warm_up(mocker):
+    FakeRDN.instances = 0
+    mocker.patch("model.super_resolution.import_module").return_value.RDN = FakeRDN
+    super_resolution = SuperResolution()
+    super_resolution.warm_up().join()
+
+    super_resolution.warm_up()
+    super_resolution.predict(np.zeros((4, 4, 3), dtype=np.uint8))
+    assert isinstance(super_resolution.model, FakeRDN)
+    assert FakeRDN.instances == 1
@@ -1,6 +1,10 @@
+import base64
+import io
 import pytest
 import json
+import folium
 import numpy as np
+from PIL import Image
 from view.web_map import WebMap
 from app_config import AppConfig
 
@@ -98,4 +102,48 @@ def test_locate_control(web_map):
     web_map.add_location_control()
     map_children = list(web_map.web_map._children.keys())
     gps_child = [item for item in map_children if item.startswith('locate')]
-    assert len(gps_child) == 1
\ No newline at end of file
+    assert len(gps_child) == 1
+
+@pytest.fixture
+def sample_rgba_array():
+    image = np.full((20, 20, 4), 120, dtype=np.uint8)
+    image[:, :10, 3] = 0
+    image[:, 10:, 3] = 255
+    return image
+
+@pytest.fixture
+def sample_png(sample_rgba_array):
+    with io.BytesIO() as buffer:
+        Image.fromarray(sample_rgba_array).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+def test_add_image_png_bytes(web_map, sample_png):
+    web_map.add_image(sample_png, [[0,0],[100,100]])
+    overlay = [child for child in web_map.web_map._children.values()
+               if isinstance(child, folium.raster_layers.ImageOverlay)][0]
+    assert overlay.url == f"data:image/png;base64,{base64.b64encode(sample_png).decode()}"
+
+def test_get_image_url_webp(web_map, sample_png):
+    image_url = web_map.get_image_url(sample_png, "WEBP", quality=50)
+    assert image_url.startswith("data:image/webp;base64,")
+    image = Image.open(io.BytesIO(base64.b64decode(image_url.split(",", 1)[1])))
+    assert image.format == "WEBP"
+    assert image.mode == "RGBA"
+
+def test_get_image_url_jpeg_with_mask(web_map, sample_rgba_array):
+    image_url = web_map.get_image_url(sample_rgba_array, "JPEG")
+    assert image_url.startswith("data:image/svg+xml;base64,")
+    svg = base64.b64decode(image_url.split(",", 1)[1]).decode()
+    assert 'mask="url(#alpha)"' in svg
+    assert "data:image/jpeg;base64," in svg
+
+def test_get_image_url_jpeg_opaque(web_map, sample_rgba_array):
+    sample_rgba_array[:, :, 3] = 255
+    assert web_map.get_image_url(sample_rgba_array, "JPEG").startswith("data:image/jpeg;base64,")
+
+def test_add_tile_layer(web_map):
+    web_map.add_tile_layer("http://localhost:8765/abc/{z}/{x}/{y}.png", bounds=[[0,0],[1,1]])
+    tile_layers = [child for child in web_map.web_map._children.values()
+                   if isinstance(child, folium.raster_layers.TileLayer)]
+    assert tile_layers[0].tiles == "http://localhost:8765/abc/{z}/{x}/{y}.png"
+    assert tile_layers[0].overlay